@@ -1,4 +1,4 @@
-import { parseSignedInt } from "../utils/helpers";
+import { rewardAmount } from "../utils/helpers";
 import {
     CardData,
     CardBonus,
@@ -9,6 +9,7 @@ import {
     HintResult,
     AllEvents,
     EventData,
+    EventReward,
 } from "../types/cardTypes";
 import { SkillHintEvaluator } from "./SkillHintEvaluator";
 
@@ -213,8 +214,8 @@ export class SupportCard {
 
                 for (const choice of arrowEvent.choices || []) {
                     // Split rewards by "di" separator - each section is a mutually exclusive outcome
-                    const rewardGroups: Array<Array<{ type: string; value: string }>> = [];
-                    let currentGroup: Array<{ type: string; value: string }> = [];
+                    const rewardGroups: Array<Array<EventReward>> = [];
+                    let currentGroup: Array<EventReward> = [];
                     
                     for (const reward of choice.rewards || []) {
                         if (reward.type === "di") {
@@ -262,7 +263,7 @@ export class SupportCard {
                                 const rtype = reward.type;
                                 // Handle "All Stats" type - add value to all 5 main stats
                                 if (rtype === "All Stats") {
-                                    const value = parseSignedInt(reward.value);
+                                    const value = rewardAmount(reward);
                                     groupStats["Speed"] += value;
                                     groupStats["Stamina"] += value;
                                     groupStats["Power"] += value;
@@ -270,9 +271,9 @@ export class SupportCard {
                                     groupStats["Wit"] += value;
                                 } else if (rtype === "Intelligence") {
                                     // Map "Intelligence" from events to "Wit" in stats
-                                    groupStats["Wit"] += parseSignedInt(reward.value);
+                                    groupStats["Wit"] += rewardAmount(reward);
                                 } else if (rtype in groupStats) {
-                                    groupStats[rtype] += parseSignedInt(reward.value);
+                                    groupStats[rtype] += rewardAmount(reward);
                                 }
                             }
                             
@@ -305,7 +306,7 @@ export class SupportCard {
                             const rtype = reward.type;
                             // Handle "All Stats" type - add value to all 5 main stats
                             if (rtype === "All Stats") {
-                                const value = parseSignedInt(reward.value);
+                                const value = rewardAmount(reward);
                                 groupStats["Speed"] += value;
                                 groupStats["Stamina"] += value;
                                 groupStats["Power"] += value;
@@ -313,9 +314,9 @@ export class SupportCard {
                                 groupStats["Wit"] += value;
                             } else if (rtype === "Intelligence") {
                                 // Map "Intelligence" from events to "Wit" in stats
-                                groupStats["Wit"] += parseSignedInt(reward.value);
+                                groupStats["Wit"] += rewardAmount(reward);
                             } else if (rtype in groupStats) {
-                                groupStats[rtype] += parseSignedInt(reward.value);
+                                groupStats[rtype] += rewardAmount(reward);
                             }
                         }
                         
@@ -3,10 +3,13 @@
 import { useState, useEffect, useMemo } from "react";
 import Image from "next/image";
 import { getAssetPath } from "../utils/paths";
-import allDataRaw from "../data/data.json";
+import allDataRawJson from "../data/data.json";
+import { expandCardData } from "../utils/helpers";
 import { CardData } from "../types/cardTypes";
 import CardTypeSelector, { CardTypeFilter } from "./CardTypeSelector";
 
+const allDataRaw = expandCardData(allDataRawJson);
+
 // Define ownership levels
 type OwnershipLevel = -1 | 0 | 1 | 2 | 3 | 4;
 
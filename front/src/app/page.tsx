@@ -5,7 +5,8 @@ import { useState, useEffect, startTransition, useCallback, useRef } from "react
 import { Tierlist, LimitBreakFilter, TierlistResponse, TierlistEntry, TierlistError } from "./classes/Tierlist";
 import { DeckEvaluator } from "./classes/DeckEvaluator";
 import { SupportCard } from "./classes/SupportCard";
-import allDataRaw from "./data/data.json";
+import allDataRawJson from "./data/data.json";
+import { expandCardData } from "./utils/helpers";
 import { CardData } from "./types/cardTypes";
 import TierlistDisplay from "./components/TierlistDisplay";
 import TierlistCard from "./components/TierlistCard";
@@ -16,6 +17,8 @@ import BlueSparksSelector from "./components/BlueSparksSelector";
 import CardCollectionManager from "./components/CardCollectionManager";
 import { TrainingData, SparkSlot, MAX_SPARKS } from "./config/trainingData";
 
+const allDataRaw = expandCardData(allDataRawJson);
+
 // Types for our form state
 type RaceType = "Sprint" | "Mile" | "Medium" | "Long";
 type RunningStyle =
@@ -25,11 +25,15 @@ export interface UniqueEffect {
     }>;
 }
 
+export interface EventReward {
+    type: string;
+    value: string;
+    // Numeric value decoded by the preprocessing scraper (absent for non-numeric rewards)
+    amount?: number;
+}
+
 export interface EventChoice {
-    rewards: Array<{
-        type: string;
-        value: string;
-    }>;
+    rewards: EventReward[];
 }
 
 export interface EventData {
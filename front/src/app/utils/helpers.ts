@@ -1,3 +1,5 @@
+import { CardData, EventReward, HintData } from "../types/cardTypes";
+
 // Helper functions ported from helper.py
 export function parseSignedInt(s: string): number {
     s = s.trim();
@@ -16,6 +18,12 @@ export function parseSignedInt(s: string): number {
     return parseInt(s);
 }
 
+// Numeric value of an event reward: the amount decoded at preprocessing time, parsed from the
+// value string only for data without it
+export function rewardAmount(reward: EventReward): number {
+    return reward.amount ?? parseSignedInt(reward.value);
+}
+
 export function lerpLevels(values: number[]): number[] {
     const n = values.length;
     const result = [...values];
@@ -68,3 +76,34 @@ export function lerpLevels(values: number[]): number[] {
 
     return result;
 }
+
+// Ported from skill_table.expand_skills: data.json is either the nested card list or a
+// skills-normalized document whose hints reference a top-level skills table by id.
+interface SkillsNormalizedData {
+    format: "skills-normalized";
+    version: number;
+    skills: Record<string, HintData["skill_data"]>;
+    cards: CardData[];
+}
+
+function isSkillsNormalized(raw: unknown): raw is SkillsNormalizedData {
+    return typeof raw === "object" && raw !== null && !Array.isArray(raw)
+        && (raw as { format?: unknown }).format === "skills-normalized";
+}
+
+export function expandCardData(raw: unknown): CardData[] {
+    if (!isSkillsNormalized(raw)) {
+        return raw as CardData[];
+    }
+    const { skills, cards } = raw;
+    const expandHints = (hints?: HintData[]): HintData[] | undefined =>
+        hints?.map(hint => {
+            const skill = skills[String(hint.skill_id)];
+            return hint.skill_data === undefined && skill ? { ...hint, skill_data: skill } : hint;
+        });
+    return cards.map(card => ({
+        ...card,
+        hints_table: expandHints(card.hints_table),
+        hints_event_table: expandHints(card.hints_event_table),
+    }));
+}
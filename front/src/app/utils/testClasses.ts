@@ -2,7 +2,10 @@ import { SupportCard } from "../classes/SupportCard";
 import { DeckEvaluator } from "../classes/DeckEvaluator";
 import { Tierlist } from "../classes/Tierlist";
 import { CardData } from "../types/cardTypes";
-import cardData from "../data/data.json";
+import cardDataJson from "../data/data.json";
+import { expandCardData } from "./helpers";
+
+const cardData = expandCardData(cardDataJson);
 
 export function testClasses() {
     console.log("Testing converted classes...");
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from helper import write_atomic
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Zero-length IEND chunk and its CRC: the last 12 bytes of every complete PNG
+_PNG_END = b'\x00\x00\x00\x00IEND\xaeB`\x82'
+
+
+class AssetManifest:
+    """
+    Record of every downloaded asset (card art, skill icons): its URL, size, sha256 and the
+    ETag / Last-Modified validators it was served with, keyed by file path relative to the
+    manifest. Lets a run tell intact files from truncated or modified ones, refresh files with
+    conditional requests, and remove files that nothing references any more.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._base = os.path.dirname(os.path.abspath(path))
+        self._assets: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._assets = json.load(f).get("assets", {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self._base).replace(os.sep, '/')
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._base, key)
+
+    def entry(self, path: str) -> Optional[Dict]:
+        with self._lock:
+            return self._assets.get(self._key(path))
+
+    def verify(self, path: str) -> bool:
+        """
+        Whether the file at path is the one recorded. Size and mtime matching the record is trusted
+        as is; otherwise the content hash decides (and the record's mtime is refreshed on a match).
+        """
+        entry = self.entry(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if entry is None or stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        if self.file_hash(path) != entry["sha256"]:
+            return False
+        with self._lock:
+            entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def record(self, path: str, url: str, content: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Record a file just written with content."""
+        self._store(path, url, hashlib.sha256(content).hexdigest(), etag, last_modified)
+
+    def adopt(self, path: str, url: str) -> bool:
+        """
+        Record a file that already exists but was never recorded (e.g. from before the manifest).
+        Files from the old non-atomic downloader may be truncated, so only a file that passes
+        looks_complete is adopted. Returns whether it was; anything else should be fetched again.
+        """
+        if not self.looks_complete(path):
+            return False
+        self._store(path, url, self.file_hash(path), None, None)
+        return True
+
+    def _store(self, path: str, url: str, digest: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        stat = os.stat(path)
+        with self._lock:
+            self._assets[self._key(path)] = {
+                "url": url,
+                "size": stat.st_size,
+                "sha256": digest,
+                "etag": etag,
+                "last_modified": last_modified,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+
+    def conditional_headers(self, path: str) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified for the recorded file."""
+        entry = self.entry(path) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def prune(self, keep: Iterable[str]) -> List[str]:
+        """Delete every recorded file not in keep (paths) and forget it. Returns the deleted paths."""
+        keep_keys = {self._key(path) for path in keep}
+        removed = []
+        with self._lock:
+            for key in [key for key in self._assets if key not in keep_keys]:
+                path = self._path(key)
+                try:
+                    os.remove(path)
+                    removed.append(path)
+                except FileNotFoundError:
+                    pass
+                del self._assets[key]
+        return removed
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, write_atomic(self.path) as f:
+            json.dump({"assets": self._assets}, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    @staticmethod
+    def looks_complete(path: str) -> bool:
+        """Whether path is a whole PNG: signature at the start and the IEND chunk at the end. Other formats are never trusted."""
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(len(_PNG_SIGNATURE))
+                if head != _PNG_SIGNATURE:
+                    return False
+                f.seek(0, os.SEEK_END)
+                if f.tell() < len(_PNG_SIGNATURE) + len(_PNG_END):
+                    return False
+                f.seek(-len(_PNG_END), os.SEEK_END)
+                return f.read() == _PNG_END
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -0,0 +1,163 @@
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Sequence
+
+from tqdm import tqdm
+
+from helper import write_atomic
+
+
+def _load_pillow():
+    """Pillow is only needed for this optional stage, so it's imported on first use."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+class AssetOptimizer:
+    """
+    Optional post-download stage: writes size-optimized WebP/AVIF variants and thumbnails next to
+    the downloaded PNGs, and packs the skill icons into sprite atlases with a coordinate map.
+    Outputs are only rebuilt when their source PNG is newer. Requires Pillow.
+    """
+
+    FORMATS = ("webp", "avif")
+    THUMBNAIL_DIR = "thumbs"
+    ATLAS_DIR = "atlas"
+
+    def __init__(self, formats: Sequence[str] = ("webp",), quality: int = 80, thumbnail_width: Optional[int] = 128, workers: Optional[int] = None) -> None:
+        unknown = [f for f in formats if f not in self.FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown image formats {unknown}, expected some of {self.FORMATS}")
+        self.formats = tuple(formats)
+        self.quality = quality
+        self.thumbnail_width = thumbnail_width
+        self.workers = workers
+        self.image = _load_pillow()
+
+    @property
+    def available(self) -> bool:
+        return self.image is not None
+
+    def optimize_directory(self, directory: str, thumbnails: bool = True) -> Dict[str, int]:
+        """
+        Write <name>.<format> for every <name>.png in directory (and thumbs/<name>.<format> when
+        thumbnails is set), then delete variants whose PNG is gone. Returns counts of written,
+        up-to-date and removed files.
+        """
+        sources = sorted(name for name in os.listdir(directory) if name.endswith('.png'))
+        thumbnail_dir = os.path.join(directory, self.THUMBNAIL_DIR)
+        if thumbnails and self.thumbnail_width:
+            os.makedirs(thumbnail_dir, exist_ok=True)
+
+        # Pillow releases the GIL while encoding, so threads are enough here
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            written = list(tqdm(executor.map(lambda name: self._optimize_file(directory, name, thumbnails), sources), total=len(sources)))
+
+        stems = {os.path.splitext(name)[0] for name in sources}
+        removed = 0
+        for folder in (directory, thumbnail_dir):
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                stem, extension = os.path.splitext(name)
+                if extension[1:] in self.FORMATS and stem not in stems:
+                    os.remove(os.path.join(folder, name))
+                    removed += 1
+        return {"written": sum(written), "up_to_date": len(sources) * self._variants_per_file(thumbnails) - sum(written), "removed": removed}
+
+    def _variants_per_file(self, thumbnails: bool) -> int:
+        return len(self.formats) * (2 if thumbnails and self.thumbnail_width else 1)
+
+    def _optimize_file(self, directory: str, name: str, thumbnails: bool) -> int:
+        source = os.path.join(directory, name)
+        stem = os.path.splitext(name)[0]
+        source_mtime = os.stat(source).st_mtime_ns
+        targets = []
+        for image_format in self.formats:
+            targets.append((os.path.join(directory, f"{stem}.{image_format}"), image_format, None))
+            if thumbnails and self.thumbnail_width:
+                targets.append((os.path.join(directory, self.THUMBNAIL_DIR, f"{stem}.{image_format}"), image_format, self.thumbnail_width))
+        targets = [target for target in targets if not os.path.exists(target[0]) or os.stat(target[0]).st_mtime_ns < source_mtime]
+        if not targets:
+            return 0
+
+        with self.image.open(source) as image:
+            image.load()
+            for path, image_format, width in targets:
+                output = image
+                if width and image.width > width:
+                    output = image.resize((width, round(image.height * width / image.width)), self.image.Resampling.LANCZOS)
+                self._save(output, path, image_format)
+        return len(targets)
+
+    def _save(self, image, path: str, image_format: str, lossless: bool = False) -> None:
+        with write_atomic(path, 'wb') as f:
+            if image_format == "png":
+                image.save(f, format="PNG", optimize=True)
+            elif lossless:
+                image.save(f, format=image_format.upper(), lossless=True)
+            else:
+                image.save(f, format=image_format.upper(), quality=self.quality)
+
+    def build_atlas(self, directory: str, map_path: str, icons_per_sheet: int = 256) -> Dict:
+        """
+        Pack every PNG icon in directory into square-ish sprite sheets (atlas/skills_<n>.png plus
+        the configured formats, losslessly) on a grid of the largest icon size, and write the
+        coordinate map to map_path:
+            {"cell": [w, h], "sheets": ["atlas/skills_0", ...],
+             "icons": {"<icon_id>": {"sheet": 0, "x": 0, "y": 0, "w": 64, "h": 64}}}
+        Sheet names carry no extension; the front end appends the format it wants.
+        """
+        names = sorted((name for name in os.listdir(directory) if name.endswith('.png')), key=lambda name: (len(name), name))
+        atlas_map = {"cell": [0, 0], "sheets": [], "icons": {}}
+        if not names:
+            self._write_map(map_path, atlas_map)
+            return atlas_map
+
+        icons = []
+        for name in names:
+            with self.image.open(os.path.join(directory, name)) as icon:
+                icons.append((os.path.splitext(name)[0], icon.convert("RGBA")))
+        cell_width = max(icon.width for _, icon in icons)
+        cell_height = max(icon.height for _, icon in icons)
+        atlas_map["cell"] = [cell_width, cell_height]
+
+        atlas_dir = os.path.join(directory, self.ATLAS_DIR)
+        os.makedirs(atlas_dir, exist_ok=True)
+        for sheet_index, start in enumerate(range(0, len(icons), icons_per_sheet)):
+            sheet_icons = icons[start:start + icons_per_sheet]
+            columns = math.ceil(math.sqrt(len(sheet_icons)))
+            rows = math.ceil(len(sheet_icons) / columns)
+            sheet = self.image.new("RGBA", (columns * cell_width, rows * cell_height))
+            for position, (icon_id, icon) in enumerate(sheet_icons):
+                x, y = (position % columns) * cell_width, (position // columns) * cell_height
+                sheet.paste(icon, (x, y))
+                atlas_map["icons"][icon_id] = {"sheet": sheet_index, "x": x, "y": y, "w": icon.width, "h": icon.height}
+
+            sheet_name = f"skills_{sheet_index}"
+            self._save(sheet, os.path.join(atlas_dir, f"{sheet_name}.png"), "png")
+            for image_format in self.formats:
+                self._save(sheet, os.path.join(atlas_dir, f"{sheet_name}.{image_format}"), image_format, lossless=True)
+            atlas_map["sheets"].append(f"{self.ATLAS_DIR}/{sheet_name}")
+
+        # Drop sheets left over from a run with more icons
+        sheet_names = {os.path.basename(sheet) for sheet in atlas_map["sheets"]}
+        for name in os.listdir(atlas_dir):
+            if name.startswith("skills_") and name.split('.')[0] not in sheet_names:
+                os.remove(os.path.join(atlas_dir, name))
+
+        self._write_map(map_path, atlas_map)
+        return atlas_map
+
+    @staticmethod
+    def _write_map(path: str, atlas_map: Dict) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with write_atomic(path) as f:
+            json.dump(atlas_map, f, indent=2)
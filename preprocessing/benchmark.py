@@ -0,0 +1,194 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+from database import Database
+
+
+def time_extraction() -> tuple:
+    """Run one full extraction, returning (seconds, serialized output)."""
+    start = time.perf_counter()
+    # Silence the tqdm progress bar so it doesn't interleave with the report
+    with contextlib.redirect_stderr(io.StringIO()):
+        cards = Database().get_all_support_cards([])
+    elapsed = time.perf_counter() - start
+    return elapsed, json.dumps(cards, ensure_ascii=False, indent=2)
+
+
+def benchmark_open_modes(db_path: str, repeat: int) -> None:
+    """
+    Compare extraction times for every Database open mode.
+    "cold" is the first extraction after configuring (new connection, empty text index and
+    skill cache); "warm" is the best of the following runs on the same connection. The OS
+    page cache is not flushed, so run the script twice for a truly cold first number.
+    """
+    reference = None
+    print(f"{'mode':<10} {'cold (s)':>10} {'warm (s)':>10}")
+    for mode in Database.OPEN_MODES:
+        Database.configure(db_path, open_mode=mode)
+        Database.reset()
+
+        cold, output = time_extraction()
+        warm = min(time_extraction()[0] for _ in range(repeat))
+        Database().close()
+
+        if reference is None:
+            reference = output
+        elif output != reference:
+            print(f"WARNING: output for open mode {mode!r} differs from {Database.OPEN_MODES[0]!r}")
+        print(f"{mode:<10} {cold:>10.3f} {warm:>10.3f}")
+
+
+def benchmark_event_payload_extraction(pages_dir: str, repeat: int) -> None:
+    """
+    Per-page CPU time of the fast __NEXT_DATA__ slicer vs the full BeautifulSoup parse, over a
+    directory of recorded card pages (raw HTML files).
+    """
+    from event_scraper import EventScraper, fast_extract_event_payload
+
+    scraper = EventScraper()
+    pages = []
+    for name in sorted(os.listdir(pages_dir)):
+        with open(os.path.join(pages_dir, name), 'rb') as f:
+            pages.append(f.read())
+    if not pages:
+        print(f"No pages found in {pages_dir}")
+        return
+
+    def best_time(extract) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.process_time()
+            for page in pages:
+                extract(page)
+            best = min(best, time.process_time() - start)
+        return best
+
+    mismatches = sum(fast_extract_event_payload(page) != scraper.parse_event_payload(page.decode('utf-8', errors='replace')) for page in pages)
+    fast = best_time(fast_extract_event_payload)
+    full = best_time(lambda page: scraper.parse_event_payload(page.decode('utf-8', errors='replace')))
+    print(f"{len(pages)} pages, {mismatches} where the fast path differs (those fall back to the full parse)")
+    print(f"{'extractor':<15} {'ms/page':>10}")
+    print(f"{'beautifulsoup':<15} {full / len(pages) * 1000:>10.3f}")
+    print(f"{'fast':<15} {fast / len(pages) * 1000:>10.3f}")
+    print(f"saved {(full - fast) / len(pages) * 1000:.3f} ms CPU per page ({full / fast:.1f}x)")
+
+
+def benchmark_effect_export(data_path: str, repeat: int) -> None:
+    """Loading the effects from data.json vs from the memory-mapped .npy export."""
+    import tempfile
+    from effect_export import EffectExporter
+
+    with open(data_path, 'r', encoding='utf-8') as f:
+        cards = json.load(f)
+    with tempfile.TemporaryDirectory() as directory:
+        exporter = EffectExporter(directory)
+        exporter.write(cards)
+
+        def best_time(load) -> float:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                load()
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        def from_json():
+            with open(data_path, 'r', encoding='utf-8') as f:
+                return EffectExporter.build(json.load(f))
+
+        arrays = exporter.load()
+        print(f"{len(cards)} cards, values array {arrays.values.shape} ({arrays.values.nbytes} bytes)")
+        print(f"{'source':<15} {'ms':>10}")
+        print(f"{'data.json':<15} {best_time(from_json) * 1000:>10.3f}")
+        print(f"{'npy (mmap)':<15} {best_time(exporter.load) * 1000:>10.3f}")
+
+
+# Modules the fast paths must not load; each is only needed by the stages that use it
+HEAVY_MODULES = ("requests", "urllib3", "bs4", "numpy", "tqdm", "sqlite3", "PIL", "brotli")
+
+
+def import_profile(command: list) -> tuple:
+    """Run command under -X importtime in a fresh interpreter. Returns (wall seconds, {top-level module: self µs})."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *command], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} exited with {result.returncode}:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        top = name.strip().split(".")[0]
+        modules[top] = modules.get(top, 0) + int(self_us)
+    return elapsed, modules
+
+
+def check_import_time(data_path: str, budget_ms: float, repeat: int) -> bool:
+    """
+    Cold start regression check: `main.py --help` and DataCollector.get_data serving an existing
+    data.json must stay under budget_ms of imports (best of repeat fresh interpreters) and must
+    not load any of HEAVY_MODULES. Modules a bare interpreter already loads at startup (site and
+    whatever .pth files pull in) are not counted. Returns whether every case passed.
+    """
+    startup = set(import_profile(["-c", "pass"])[1])
+    cases = [
+        ("main.py --help", ["main.py", "--help"]),
+        ("get_data (data.json)", ["-c", f"from data_collecter import DataCollector; DataCollector().get_data(output_path={os.path.abspath(data_path)!r})"]),
+    ]
+    passed = True
+    print(f"{'case':<22} {'wall (ms)':>10} {'imports (ms)':>13}  heavy modules loaded")
+    for name, command in cases:
+        runs = [import_profile(command) for _ in range(repeat)]
+        wall = min(elapsed for elapsed, _ in runs)
+        imports = min(sum(us for module, us in modules.items() if module not in startup) for _, modules in runs) / 1000
+        heavy = sorted(set(runs[0][1]) & set(HEAVY_MODULES))
+        ok = imports <= budget_ms and not heavy
+        passed = passed and ok
+        print(f"{name:<22} {wall * 1000:>10.1f} {imports:>13.1f}  {', '.join(heavy) or '-'}{'' if ok else '  FAIL'}")
+    print(f"budget: {budget_ms:.0f} ms of imports per case, beyond interpreter startup")
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Preprocessing micro-benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    open_modes = subparsers.add_parser('open-modes', help='Support card extraction time for each master.mdb open mode')
+    open_modes.add_argument('--db', default='./db/master.mdb', help='Path to the Access database file')
+    open_modes.add_argument('--repeat', type=int, default=3, help='Number of warm runs per mode (best is reported)')
+
+    event_payload = subparsers.add_parser('event-payload', help='Fast vs BeautifulSoup extraction of the event data from card pages')
+    event_payload.add_argument('--pages', required=True, help='Directory of recorded card pages')
+    event_payload.add_argument('--repeat', type=int, default=3, help='Number of runs per extractor (best is reported)')
+
+    effect_export = subparsers.add_parser('effect-export', help='Loading card effects from data.json vs the memory-mapped .npy export')
+    effect_export.add_argument('--data', default='../front/src/app/data/data.json', help='Path to data.json')
+    effect_export.add_argument('--repeat', type=int, default=5, help='Number of runs per source (best is reported)')
+
+    import_time = subparsers.add_parser('import-time', help='Cold start check: import time of the CLI fast paths against a budget (exits 1 when over it)')
+    import_time.add_argument('--data', default='../front/src/app/data/data.json', help='Existing data.json served by the get_data fast path')
+    import_time.add_argument('--budget-ms', type=float, default=25.0, help='Maximum import time per case in milliseconds')
+    import_time.add_argument('--repeat', type=int, default=5, help='Number of fresh interpreters per case (best is reported)')
+
+    args = parser.parse_args()
+    if args.benchmark == 'open-modes':
+        benchmark_open_modes(args.db, args.repeat)
+    elif args.benchmark == 'event-payload':
+        benchmark_event_payload_extraction(args.pages, args.repeat)
+    elif args.benchmark == 'effect-export':
+        benchmark_effect_export(args.data, args.repeat)
+    elif args.benchmark == 'import-time':
+        if not check_import_time(args.data, args.budget_ms, args.repeat):
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List
+
+from helper import write_atomic
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE cards (
+    id INTEGER PRIMARY KEY,
+    chara_id_card INTEGER,
+    card_chara_name TEXT,
+    rarity INTEGER,
+    support_card_type INTEGER,
+    prefered_type_id INTEGER,
+    prefered_type TEXT,
+    effect_table_id INTEGER,
+    unique_effect_id INTEGER,
+    command_id INTEGER,
+    skill_set_id INTEGER
+);
+CREATE TABLE effects (
+    card_id INTEGER NOT NULL REFERENCES cards(id),
+    type INTEGER NOT NULL,
+    type_name TEXT,
+    lb0 REAL, lb1 REAL, lb2 REAL, lb3 REAL, mlb REAL,
+    PRIMARY KEY (card_id, type)
+) WITHOUT ROWID;
+CREATE TABLE unique_effects (
+    card_id INTEGER NOT NULL REFERENCES cards(id),
+    level_unlocked TEXT,
+    position INTEGER NOT NULL,
+    type INTEGER,
+    type_name TEXT,
+    value REAL,
+    value_1 REAL, value_2 REAL, value_3 REAL, value_4 REAL
+);
+CREATE TABLE skills (
+    id INTEGER PRIMARY KEY,
+    rarity INTEGER,
+    group_id INTEGER,
+    icon_id INTEGER,
+    grade_value INTEGER,
+    condition_1 TEXT,
+    skill_time_active INTEGER,
+    skill_cooldown_time INTEGER,
+    ability_type INTEGER,
+    ability_value INTEGER,
+    skill_name TEXT,
+    skill_desc TEXT
+);
+CREATE TABLE skill_hints (
+    card_id INTEGER NOT NULL REFERENCES cards(id),
+    source TEXT NOT NULL,           -- 'training' (hints_table) or 'event' (hints_event_table)
+    skill_id INTEGER NOT NULL,
+    hint_level INTEGER,
+    PRIMARY KEY (card_id, source, skill_id)
+) WITHOUT ROWID;
+CREATE TABLE stat_hints (
+    card_id INTEGER NOT NULL REFERENCES cards(id),
+    position INTEGER NOT NULL,
+    stat_id TEXT,
+    value INTEGER
+);
+CREATE TABLE events (
+    card_id INTEGER NOT NULL REFERENCES cards(id),
+    category TEXT NOT NULL,         -- chain_events, dates, random_events, special_events
+    event_index INTEGER NOT NULL,
+    variant INTEGER NOT NULL,       -- 0 for the event itself, 1.. for its history variants in order
+    period TEXT,                    -- the history variant's period, NULL for variant 0
+    name TEXT,
+    PRIMARY KEY (card_id, category, event_index, variant)
+) WITHOUT ROWID;
+CREATE TABLE event_rewards (
+    card_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    event_index INTEGER NOT NULL,
+    variant INTEGER NOT NULL,
+    choice_index INTEGER NOT NULL,
+    option TEXT,
+    reward_index INTEGER NOT NULL,
+    type TEXT,
+    value TEXT,
+    amount REAL,                    -- numeric value decoded by the scraper, NULL when not numeric
+    detail TEXT                     -- JSON of any extra reward fields
+);
+'''
+
+_INDEXES = '''
+CREATE INDEX cards_rarity_type ON cards (rarity, prefered_type_id);
+CREATE INDEX cards_chara ON cards (chara_id_card);
+CREATE INDEX effects_type ON effects (type, card_id);
+CREATE INDEX unique_effects_card ON unique_effects (card_id);
+CREATE INDEX unique_effects_type ON unique_effects (type);
+CREATE INDEX skills_group ON skills (group_id);
+CREATE INDEX skill_hints_skill ON skill_hints (skill_id, card_id);
+CREATE INDEX stat_hints_card ON stat_hints (card_id);
+CREATE INDEX event_rewards_event ON event_rewards (card_id, category, event_index, variant);
+CREATE INDEX event_rewards_type ON event_rewards (type);
+'''
+
+_CARD_COLUMNS = ("id", "chara_id_card", "card_chara_name", "rarity", "support_card_type", "prefered_type_id",
+                 "prefered_type", "effect_table_id", "unique_effect_id", "command_id", "skill_set_id")
+_SKILL_COLUMNS = ("id", "rarity", "group_id", "icon_id", "grade_value", "condition_1", "skill_time_active",
+                  "skill_cooldown_time", "ability_type", "ability_value", "skill_name", "skill_desc")
+_LIMIT_BREAKS = ("0lb", "1lb", "2lb", "3lb", "mlb")
+_HINT_SOURCES = (("hints_table", "training"), ("hints_event_table", "event"))
+
+
+class CardCatalog:
+    """
+    Derived SQLite catalog of the processed cards, for tools that want indexed queries instead of
+    loading and scanning data.json, e.g. every SSR Speed card that hints a given skill:
+
+        SELECT DISTINCT c.id, c.card_chara_name FROM cards c
+        JOIN skill_hints h ON h.card_id = c.id
+        WHERE c.rarity = 3 AND c.prefered_type = 'Speed' AND h.skill_id = ?
+
+    The file is rebuilt from scratch every run and swapped into place atomically.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def write(self, cards: List[Dict[str, Any]]) -> Dict[str, int]:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # SQLite builds the database in the (empty) temporary file through its own connection
+        with write_atomic(self.path, 'wb') as f:
+            conn = sqlite3.connect(f.name)
+            try:
+                # Nothing to recover from a half-built temp file, so skip the journal and fsyncs
+                conn.execute("PRAGMA journal_mode = OFF")
+                conn.execute("PRAGMA synchronous = OFF")
+                conn.executescript(_SCHEMA)
+                with conn:
+                    counts = self._insert(conn, cards)
+                # Building the indexes after the bulk insert is cheaper than maintaining them row by row
+                conn.executescript(_INDEXES)
+                conn.execute("ANALYZE")
+                conn.commit()
+            finally:
+                conn.close()
+        return counts
+
+    def _insert(self, conn: sqlite3.Connection, cards: List[Dict[str, Any]]) -> Dict[str, int]:
+        rows: Dict[str, List[tuple]] = {table: [] for table in ("cards", "effects", "unique_effects", "skills", "skill_hints", "stat_hints", "events", "event_rewards")}
+        skills: Dict[int, Dict[str, Any]] = {}
+
+        for card in cards:
+            card_id = card["id"]
+            rows["cards"].append(tuple(card.get(column) for column in _CARD_COLUMNS))
+
+            for effect in card.get("effects", []):
+                rows["effects"].append((card_id, effect["type"], effect.get("type_name"), *(effect.get(lb) for lb in _LIMIT_BREAKS)))
+
+            for unique in card.get("unique_effects") or []:
+                for position, effect in enumerate(unique.get("effects", [])):
+                    rows["unique_effects"].append((card_id, unique.get("level_unlocked"), position, effect.get("type"), effect.get("type_name"), effect.get("value"),
+                                                   effect.get("value_1"), effect.get("value_2"), effect.get("value_3"), effect.get("value_4")))
+
+            for field, source in _HINT_SOURCES:
+                seen = set()
+                for position, hint in enumerate(card.get(field, [])):
+                    if hint.get("type") == "skill_hint":
+                        skill = hint.get("skill_data")
+                        if isinstance(skill, dict):
+                            skills.setdefault(hint["skill_id"], skill)
+                        if hint["skill_id"] not in seen:
+                            seen.add(hint["skill_id"])
+                            rows["skill_hints"].append((card_id, source, hint["skill_id"], hint.get("hint_level")))
+                    elif hint.get("type") == "stat_hint":
+                        for stat in hint.get("stats", []):
+                            rows["stat_hints"].append((card_id, position, stat.get("stat_id"), stat.get("value")))
+
+            for category, events in (card.get("all_events") or {}).items():
+                for event_index, event in enumerate(events):
+                    # The event itself, then its history variants (whose choices can hint skills too)
+                    for variant, version in enumerate([event] + event.get("history", [])):
+                        rows["events"].append((card_id, category, event_index, variant, version.get("period"), version.get("name")))
+                        for choice_index, choice in enumerate(version.get("choices", [])):
+                            for reward_index, reward in enumerate(choice.get("rewards", [])):
+                                extra = {key: value for key, value in reward.items() if key not in ("type", "value", "amount")}
+                                rows["event_rewards"].append((card_id, category, event_index, variant, choice_index, choice.get("option"), reward_index,
+                                                              reward.get("type"), reward.get("value"), reward.get("amount"),
+                                                              json.dumps(extra, ensure_ascii=False) if extra else None))
+
+        rows["skills"] = [tuple(skill.get(column) for column in _SKILL_COLUMNS) for _, skill in sorted(skills.items())]
+
+        for table, table_rows in rows.items():
+            if table_rows:
+                placeholders = ",".join("?" * len(table_rows[0]))
+                conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", table_rows)
+        conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        return {table: len(table_rows) for table, table_rows in rows.items()}
@@ -1,30 +1,66 @@
 import os
 import json
 
-from tqdm import tqdm
-from database import Database
-from event_scraper import EventScraper
-from helper import read_json_file
+# Only light modules at load time: serving an existing data.json must not pull in the database,
+# scraper or network stack. Everything else is imported by the step that needs it.
+from skill_table import expand_skills, normalize_skills
+from helper import read_json_file, write_atomic
 
-from typing import Optional, Any
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from asset_manifest import AssetManifest
+    from download_queue import DownloadQueue
+    from fetcher import Fetcher
 
 class DataCollector:
     _instance: Optional['DataCollector'] = None
     _data: Optional[Any] = None
+    _fetcher: Optional['Fetcher'] = None
+    # Keyword arguments for the Fetcher created on first use (e.g. requests_per_second, burst)
+    fetcher_options: Dict[str, Any] = {}
+    _extracted: bool = False
+    _database_opened: bool = False
 
     def __new__(cls) -> 'DataCollector':
         if cls._instance is None:
             cls._instance = super(DataCollector, cls).__new__(cls)
         return cls._instance
 
-    def get_data(self, db_path: str = None, output_path: str = None, skip_existing: bool = False) -> Optional[Any]:
+    def get_data(self, db_path: str = None, output_path: str = None, skip_existing: bool = False, persist_text_index: bool = False, db_open_mode: str = "default", jobs: int = 1, page_cache_dir: Optional[str] = None, offline: bool = False, compact: bool = False, compress: Sequence[str] = (), shard_dir: Optional[str] = None, normalize: bool = False, effects_dir: Optional[str] = None, catalog_path: Optional[str] = None) -> Optional[Any]:
+        """Extract, scrape and write in one go. The pipeline stages in main.py call the steps separately."""
+        if db_path is None or output_path is None:
+            # Fast path: the existing data.json as is, without loading the database or network stack
+            return self.extract(db_path, output_path, skip_existing)
+
+        # Keep the connection open for extraction and the event hint lookups done while scraping
+        try:
+            data = self.extract(db_path, output_path, skip_existing, persist_text_index, db_open_mode, jobs)
+            if data is None or not self._extracted:
+                return data
+            data = self.scrape_events(data, page_cache_dir, offline)
+        finally:
+            self.close_database()
+        self.write_outputs(data, output_path, compact, compress, shard_dir, normalize, effects_dir, catalog_path)
+        return data
+
+    def extract(self, db_path: str = None, output_path: str = None, skip_existing: bool = False, persist_text_index: bool = False, db_open_mode: str = "default", jobs: int = 1, on_card: Optional[Callable[[Dict], None]] = None) -> Optional[Any]:
+        """
+        Build the support cards from db_path, reusing unchanged cards from the existing output.
+        Without a db_path or output_path the existing output is returned as is (and `extracted`
+        stays False, so there is nothing new to scrape or write).
+        on_card gets every extracted card as soon as it is final, in no particular order; the
+        returned list has the output order.
+        """
+        self._extracted = False
         skip_dl = False
         if db_path is None or output_path is None:
             skip_dl = True
 
         current_data = None
         if output_path is not None and not skip_existing:
-            current_data = read_json_file(output_path)
+            # A skills-normalized data.json is expanded back to the nested cards the pipeline works on
+            current_data = expand_skills(read_json_file(output_path))
         elif skip_existing:
             print("Skipping existing data.json - starting fresh as requested")
 
@@ -41,106 +77,210 @@ class DataCollector:
             print(f"Database file not found: {db_path}")
             return None
 
-        Database.configure(db_path)
+        from database import Database
+        from event_scraper import EventScraper, HintBatch
+        self.open_database(db_path, persist_text_index, db_open_mode)
+
+        fingerprints = None
+        if current_data:
+            fingerprints = self.read_manifest(self.manifest_path(output_path))
+            if not fingerprints:
+                print(f"No manifest at {self.manifest_path(output_path)} - rebuilding every card from {db_path}")
+        previous_cards = {card['id']: card for card in current_data or [] if isinstance(card, dict) and 'id' in card}
+
+        rebuilt = []
+        hints = HintBatch(EventScraper(), on_card)
+
+        def finished(card: Dict) -> None:
+            # Rebuilt cards keep the events scraped for them earlier; only their hints need refreshing
+            previous = previous_cards.get(card['id'])
+            if previous is not None and previous is not card:
+                rebuilt.append(card['id'])
+                if 'all_events' in previous:
+                    card['all_events'] = previous['all_events']
+                    hints.add(card)
+                    return
+            if on_card is not None:
+                on_card(card)
 
         print(f"Extracting support cards from {db_path}...")
-        data = Database().get_all_support_cards(current_data)
+        data = Database().get_all_support_cards(current_data, fingerprints=fingerprints, jobs=jobs, on_card=finished)
+        hints.flush()
+        if previous_cards:
+            print(f"Rebuilt {len(rebuilt)} changed support cards, reused {len(previous_cards) - len(rebuilt)} unchanged")
+
+        self._extracted = True
+        self._data = data
+        return data
 
+    def scrape_events(self, data, page_cache_dir: Optional[str] = None, offline: bool = False, on_card: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Scrape the events of data (a list, or cards streamed in) in place; see EventScraper.get_events_for_support_cards."""
+        from database import Database
+        from event_scraper import EventScraper
+        from page_cache import PageCache
+        # Event hints are resolved against master.mdb
+        self._database_opened = True
         print(f"Gathering Events  for Support Cards...")
-        data = EventScraper().get_events_for_support_cards(data)
+        page_cache = PageCache(page_cache_dir) if page_cache_dir else None
+        data = EventScraper(fetcher=None if offline else self.fetcher, cache=page_cache, offline=offline).get_events_for_support_cards(data, on_card)
+        print(f"Skill cache: {Database().skill_cache_stats()}")
+        self._data = data
+        return data
 
+    def write_outputs(self, data: Iterable[Dict], output_path: str, compact: bool = False, compress: Sequence[str] = (), shard_dir: Optional[str] = None, normalize: bool = False, effects_dir: Optional[str] = None, catalog_path: Optional[str] = None) -> None:
+        """Write data.json and the optional outputs. data may be a lazy iterable; data.json is then written as the cards arrive."""
+        from data_writer import DataWriter
         print(f"Writing output to {output_path}...")
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if normalize:
+            # The skills table comes before the cards, so every card is needed up front
+            data = list(data)
+            document = normalize_skills(data)
+            print(f"Normalized {len(document['skills'])} distinct skills into a top-level table")
+            DataWriter(compact=compact, compress=compress).write(document.pop("cards"), output_path, fields=document)
+        else:
+            written = []
+
+            def collect() -> Iterator[Dict]:
+                for card in data:
+                    written.append(card)
+                    yield card
+
+            DataWriter(compact=compact, compress=compress).write(collect(), output_path)
+            data = written
+        if catalog_path:
+            from catalog import CardCatalog
+            counts = CardCatalog(catalog_path).write(data)
+            print(f"Wrote SQLite catalog to {catalog_path}: {counts}")
+        if effects_dir:
+            from effect_export import EffectExporter
+            arrays = EffectExporter(effects_dir).write(data)
+            print(f"Exported card effects as a {'x'.join(map(str, arrays.values.shape))} array to {effects_dir}")
+        if shard_dir:
+            from shard_writer import ShardWriter
+            print(f"Writing card index and detail shards to {shard_dir}...")
+            print(f"Shards: {ShardWriter(shard_dir).write(data)}")
+        # Only after a real extraction; otherwise the fingerprints aren't those of data
+        if self._extracted:
+            from database import Database
+            self.write_manifest(self.manifest_path(output_path), Database().card_fingerprints)
         print("Done.")
-        self._data = data
-        return data
 
-    def download_images(self, data, output_dir: str) -> bool:
-        import requests
-        import time
-        
-        os.makedirs(output_dir, exist_ok=True)
-        
-        for card in tqdm(data):
-            card_id = card.get('id')
-            image_url = f"https://gametora.com/images/umamusume/supports/support_card_s_{card_id}.png"
-            
-            image_path = os.path.join(output_dir, f"{card_id}.png")
-            
-            if os.path.exists(image_path):
-                continue
-                
-            try:
-                print(f"Downloading {image_url}")
-                response = requests.get(image_url, timeout=10)
-                response.raise_for_status()
-                
-                with open(image_path, 'wb') as f:
-                    f.write(response.content)
-                    
-                
-            except Exception as e:
-                print(f"Failed to download image for card {card_id}: {e}")
-                continue
+    def open_database(self, db_path: str, persist_text_index: bool = False, db_open_mode: str = "default") -> None:
+        """Point the Database at db_path, for extraction or for the event hint lookups of scrape_events."""
+        from database import Database
+        Database.configure(db_path, persist_text_index=persist_text_index, open_mode=db_open_mode)
+        self._database_opened = True
+
+    def close_database(self) -> None:
+        """Close the master.mdb connections, if a step opened any."""
+        if self._database_opened:
+            from database import Database
+            Database().close()
+            self._database_opened = False
+
+    @property
+    def extracted(self) -> bool:
+        """Whether the last extract() built the cards from master.mdb (rather than reusing the output)."""
+        return self._extracted
+
+    @staticmethod
+    def manifest_path(output_path: str) -> str:
+        """Fingerprint manifest written next to the output, e.g. data.json -> data.manifest.json"""
+        return os.path.splitext(output_path)[0] + ".manifest.json"
+
+    @staticmethod
+    def read_manifest(path: str) -> Dict[int, str]:
+        manifest = read_json_file(path)
+        if not isinstance(manifest, dict):
+            return {}
+        return {int(card_id): fingerprint for card_id, fingerprint in manifest.get("cards", {}).items()}
 
+    @staticmethod
+    def write_manifest(path: str, fingerprints: Dict[int, str]) -> None:
+        with write_atomic(path) as f:
+            json.dump({"cards": {str(card_id): fingerprint for card_id, fingerprint in fingerprints.items()}}, f, indent=2)
+
+    @property
+    def fetcher(self) -> 'Fetcher':
+        """Fetch layer shared by the event scraper and the image downloads, created on first use."""
+        if self._fetcher is None:
+            from fetcher import Fetcher
+            self._fetcher = Fetcher(**self.fetcher_options)
+        return self._fetcher
+
+    @fetcher.setter
+    def fetcher(self, fetcher: 'Fetcher') -> None:
+        self._fetcher = fetcher
+
+    @property
+    def has_fetcher(self) -> bool:
+        """Whether the fetcher was created (i.e. something went to the network or a fixture archive)."""
+        return self._fetcher is not None
+
+    def download_queue(self, workers: Optional[int] = None, manifest: Optional['AssetManifest'] = None, refresh: bool = False) -> 'DownloadQueue':
+        """A DownloadQueue on the shared fetcher; see DownloadQueue for workers, manifest and refresh."""
+        from download_queue import DownloadQueue
+        return DownloadQueue(self.fetcher, workers, manifest, refresh)
+
+    def download_images(self, data, output_dir: str, workers: Optional[int] = None) -> bool:
+        with self.download_queue(workers) as queue:
+            queue.download(self._card_image_jobs(data, output_dir))
         return True
 
-    def download_skill_images(self, data, output_dir: str) -> bool:
-        import requests
-        import time
-        
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Collect all unique icon IDs from all cards
+    def download_skill_images(self, data, output_dir: str, workers: Optional[int] = None) -> bool:
+        with self.download_queue(workers) as queue:
+            queue.download(self._skill_icon_jobs(self.skill_icon_ids(data), output_dir))
+        return True
+
+    def download_card_images(self, data, output_dir: str, queue: 'DownloadQueue') -> List[str]:
+        """Queue the card images (e.g. as a pipeline stage); data may be a Stream of cards. Returns the image paths."""
+        return queue.download(self._card_image_jobs(data, output_dir))
+
+    def download_skill_icons(self, icon_ids: Iterable[int], output_dir: str, queue: 'DownloadQueue') -> List[str]:
+        """
+        Queue skill icons as their ids arrive; icon_ids may be a Stream fed by earlier stages
+        and may repeat ids. Returns the icon paths.
+        """
+        return queue.download(self._skill_icon_jobs(icon_ids, output_dir))
+
+    @staticmethod
+    def finish_asset_manifest(manifest: 'AssetManifest', paths: Iterable[str], prune: bool = False) -> None:
+        """Optionally prune recorded files that aren't in paths (everything this run wanted), then save."""
+        if prune:
+            removed = manifest.prune(paths)
+            print(f"Pruned {len(removed)} images no longer referenced")
+        manifest.save()
+
+    @staticmethod
+    def skill_icon_ids(data) -> List[int]:
+        """Unique icon ids of the skills hinted by the cards (training and event hints)."""
         icon_ids = set()
         for card in data:
-            # Check hints_table
-            hints_table = card.get('hints_table', [])
-            for hint in hints_table:
+            for hint in card.get('hints_table', []) + card.get('hints_event_table', []):
                 if hint.get('type') == 'skill_hint':
-                    skill_data = hint.get('skill_data', {})
-                    icon_id = skill_data.get('icon_id')
+                    icon_id = (hint.get('skill_data') or {}).get('icon_id')
                     if icon_id:
                         icon_ids.add(icon_id)
-            
-            # Also check hints_event_table
-            hints_event_table = card.get('hints_event_table', [])
-            for hint in hints_event_table:
-                if hint.get('type') == 'skill_hint':
-                    skill_data = hint.get('skill_data', {})
-                    icon_id = skill_data.get('icon_id')
-                    if icon_id:
-                        icon_ids.add(icon_id)
-        
-        print(f"Found {len(icon_ids)} unique skill icons to download")
-        
-        # Download each skill icon
-        for icon_id in tqdm(icon_ids):
-            image_url = f"https://gametora.com/images/umamusume/skill_icons/utx_ico_skill_{icon_id}.png"
-            image_path = os.path.join(output_dir, f"{icon_id}.png")
-            
-            # Skip if already exists
-            if os.path.exists(image_path):
-                continue
-            
-            try:
-                print(f"Downloading skill icon {icon_id} from {image_url}")
-                response = requests.get(image_url, timeout=10)
-                response.raise_for_status()
-                
-                with open(image_path, 'wb') as f:
-                    f.write(response.content)
-                
-                # Small delay to avoid overwhelming the server
-                time.sleep(0.1)
-                    
-            except Exception as e:
-                print(f"Failed to download skill icon {icon_id}: {e}")
+        return sorted(icon_ids)
+
+    @staticmethod
+    def _card_image_jobs(data, output_dir: str) -> Iterator[Tuple[str, str, Dict]]:
+        os.makedirs(output_dir, exist_ok=True)
+        for card in data:
+            card_id = card.get('id')
+            image_url = f"https://gametora.com/images/umamusume/supports/support_card_s_{card_id}.png"
+            yield image_url, os.path.join(output_dir, f"{card_id}.png"), {"card_id": card_id, "kind": "card_image"}
+
+    @staticmethod
+    def _skill_icon_jobs(icon_ids: Iterable[int], output_dir: str) -> Iterator[Tuple[str, str, Dict]]:
+        os.makedirs(output_dir, exist_ok=True)
+        seen = set()
+        for icon_id in icon_ids:
+            if icon_id in seen:
                 continue
-        
-        return True
+            seen.add(icon_id)
+            image_url = f"https://gametora.com/images/umamusume/skill_icons/utx_ico_skill_{icon_id}.png"
+            yield image_url, os.path.join(output_dir, f"{icon_id}.png"), {"icon_id": icon_id, "kind": "skill_icon"}
 
     @property
     def data(self) -> Optional[Any]:
@@ -0,0 +1,116 @@
+import gzip
+import json
+import os
+from contextlib import ExitStack
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from helper import write_atomic
+
+
+def _load_brotli():
+    """brotli is optional; .br siblings are skipped without it."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+class DataWriter:
+    """
+    Streams a list of cards (optionally inside a document, see chunks) to a JSON file one card
+    at a time, optionally compact and with
+    precompressed .gz / .br siblings encoded on the fly. Everything is written to temp files
+    and renamed into place at the end, so a crash never leaves a partial data.json behind.
+
+    The pretty (default) output is byte-identical to json.dump(cards, f, ensure_ascii=False, indent=2).
+    """
+
+    COMPRESSIONS = ("gz", "br")
+
+    def __init__(self, compact: bool = False, compress: Sequence[str] = ()) -> None:
+        unknown = [c for c in compress if c not in self.COMPRESSIONS]
+        if unknown:
+            raise ValueError(f"Unknown compressions {unknown}, expected some of {self.COMPRESSIONS}")
+        self.compact = compact
+        self.compress = list(compress)
+        self.brotli = _load_brotli() if "br" in self.compress else None
+        if "br" in self.compress and self.brotli is None:
+            print("brotli is not installed (pip install brotli) - skipping the .br output")
+            self.compress.remove("br")
+
+    def chunks(self, cards: Iterable[Any], fields: Optional[Dict[str, Any]] = None) -> Iterable[str]:
+        """
+        The JSON text of cards, one card per chunk. With fields, the output is an object holding
+        fields followed by the streamed cards under "cards" (e.g. a normalized skills document).
+        """
+        if fields is None:
+            yield from self._array_chunks(cards, 0)
+            return
+
+        indent = "" if self.compact else "\n  "
+        colon = ":" if self.compact else ": "
+        yield "{"
+        for key, value in fields.items():
+            text = json.dumps(value, ensure_ascii=False, indent=None if self.compact else 2, separators=(",", ":") if self.compact else None)
+            yield indent + json.dumps(key) + colon + text.replace("\n", indent) + ","
+        yield indent + '"cards"' + colon
+        yield from self._array_chunks(cards, 1)
+        yield "}" if self.compact else "\n}"
+
+    def _array_chunks(self, cards: Iterable[Any], depth: int) -> Iterable[str]:
+        if self.compact:
+            opening, separator, closing, indent = "[", ",", "]", None
+        else:
+            outer = "\n" + "  " * depth
+            inner = outer + "  "
+            opening, separator, closing, indent = "[" + inner, "," + inner, outer + "]", 2
+        first = True
+        for card in cards:
+            text = json.dumps(card, ensure_ascii=False, indent=indent, separators=(",", ":") if self.compact else None)
+            if indent:
+                # Nest the card into the array; newlines inside strings are escaped
+                text = text.replace("\n", "\n" + "  " * (depth + 1))
+            yield (opening if first else separator) + text
+            first = False
+        yield "[]" if first else closing
+
+    def write(self, cards: Iterable[Any], path: str, fields: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Write cards (see chunks) to path and its compressed siblings. Returns the paths written."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        targets = [path] + [f"{path}.{compression}" for compression in self.compress]
+        with ExitStack() as stack:
+            # Closed in reverse: the compressed siblings are moved into place first, so data.json
+            # is never newer than stale siblings
+            files = [stack.enter_context(write_atomic(target, 'wb')) for target in targets]
+            raw = files[0]
+            # mtime=0 keeps the .gz byte-identical for identical data
+            gzip_file: Optional[gzip.GzipFile] = None
+            brotli_compressor = None
+            for compression, f in zip(self.compress, files[1:]):
+                if compression == "gz":
+                    gzip_file = gzip.GzipFile(fileobj=f, mode='wb', compresslevel=9, mtime=0)
+                else:
+                    brotli_compressor = (self.brotli.Compressor(quality=11), f)
+
+            for chunk in self.chunks(cards, fields):
+                data = chunk.encode('utf-8')
+                raw.write(data)
+                if gzip_file is not None:
+                    gzip_file.write(data)
+                if brotli_compressor is not None:
+                    brotli_compressor[1].write(brotli_compressor[0].process(data))
+
+            if gzip_file is not None:
+                gzip_file.close()
+            if brotli_compressor is not None:
+                brotli_compressor[1].write(brotli_compressor[0].finish())
+
+        # Siblings from an earlier run with other settings would be stale now
+        for compression in self.COMPRESSIONS:
+            if compression not in self.compress and os.path.exists(f"{path}.{compression}"):
+                os.remove(f"{path}.{compression}")
+        return targets
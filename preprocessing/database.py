@@ -1,13 +1,29 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
 import sqlite3
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable, List, Dict, Optional
 from tqdm import tqdm
 
-from helper import lerp_levels
+from helper import lerp_levels_batch
+from skill_cache import SkillCache
+from text_index import TextIndex
 
 class Database:
 
     _instance = None
     _db_path: Optional[str] = None
+    _text_index: Optional[TextIndex] = None
+    _persist_text_index: bool = False
+    # Process-wide: shared by card hint extraction and EventScraper's event hint lookups
+    _skill_cache = SkillCache()
+    _card_fingerprints: Dict[int, str] = {}
+    # Bump when the extraction logic changes so every card is rebuilt on the next incremental run
+    _fingerprint_version = 1
     
     # Define which effect types use multiplicative stacking for unique effects
     # Effect type ID -> bool (True = multiplicative, False = additive)
@@ -71,78 +87,306 @@ class Database:
         return cls._instance
 
     @classmethod
-    def configure(cls, db_path: str) -> None:
+    def configure(cls, db_path: str, persist_text_index: bool = False, open_mode: str = "default") -> None:
+        """
+        Args:
+            db_path (str): Path to master.mdb.
+            persist_text_index (bool): Cache the text_data index next to db_path (see TextIndex).
+            open_mode (str): How connections open the file, one of OPEN_MODES:
+                "default"   - plain read-only connection.
+                "immutable" - read-only and immutable (no locking or change detection), memory-mapped,
+                              with a large page cache. Only safe while nothing else writes master.mdb.
+                "memory"    - snapshot the whole file once into an in-memory database with the backup API;
+                              every thread's connection reads that one snapshot.
+        """
+        if open_mode not in cls.OPEN_MODES:
+            raise ValueError(f"Unknown open mode {open_mode!r}, expected one of {cls.OPEN_MODES}.")
+        if db_path != cls._db_path or open_mode != cls._open_mode:
+            cls.reset()
         cls._db_path = db_path
+        cls._persist_text_index = persist_text_index
+        cls._open_mode = open_mode
+
+    @classmethod
+    def reset(cls) -> None:
+        """Close all connections and drop everything cached from the current database."""
+        cls._close_connections()
+        cls._text_index = None
+        cls._skill_cache.clear()
+
+    # CONNECTION LIFECYCLE
+    # One long-lived read-only connection per thread, opened lazily on first use.
+    # sqlite3 keeps a per-connection cache of prepared statements keyed by their SQL
+    # text, so the constant queries below are only compiled once per connection.
+
+    OPEN_MODES = ("default", "immutable", "memory")
+    _open_mode = "default"
+    _statement_cache_size = 256
+    # Tuned for the scan-heavy bulk extraction: map the whole file and keep its pages cached
+    _immutable_pragmas = (
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA temp_store=MEMORY",
+    )
+    # Stay below SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds (999)
+    _max_query_params = 900
+    _local = threading.local()
+    _connections: List[sqlite3.Connection] = []
+    _connections_lock = threading.Lock()
+    # "memory" mode: a shared-cache in-memory database, kept alive by the connection it was
+    # restored into. The name changes with every snapshot so a reset never reads a stale one.
+    _snapshot: Optional[sqlite3.Connection] = None
+    _snapshot_uri: Optional[str] = None
+    _snapshot_names = itertools.count()
+    _snapshot_lock = threading.Lock()
+
+    def open(self) -> 'Database':
+        """Open the calling thread's connection now rather than on the first query."""
+        self._connection()
+        return self
+
+    def close(self) -> None:
+        """Close every connection opened by any thread. Later queries reopen lazily."""
+        self._close_connections()
+
+    def __enter__(self) -> 'Database':
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        if not self._db_path:
+            raise ValueError("Database path not configured.")
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            with self._connections_lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def _open_connection(self) -> sqlite3.Connection:
+        uri = Path(self._db_path).resolve().as_uri() + "?mode=ro"
+        if self._open_mode == "immutable":
+            uri += "&immutable=1"
+        # Each thread only ever uses its own connection; check_same_thread is off
+        # so close() can tear all of them down from the main thread.
+        if self._open_mode == "memory":
+            return sqlite3.connect(self._memory_snapshot(uri), uri=True, check_same_thread=False, cached_statements=self._statement_cache_size)
+
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=self._statement_cache_size)
+        if self._open_mode == "immutable":
+            for pragma in self._immutable_pragmas:
+                conn.execute(pragma)
+        return conn
+
+    @classmethod
+    def _memory_snapshot(cls, uri: str) -> str:
+        """URI of the in-memory copy of the database, backed up from uri by the first caller."""
+        with cls._snapshot_lock:
+            if cls._snapshot is None:
+                snapshot_uri = f"file:master_snapshot_{next(cls._snapshot_names)}?mode=memory&cache=shared"
+                snapshot = sqlite3.connect(snapshot_uri, uri=True, check_same_thread=False)
+                source = sqlite3.connect(uri, uri=True)
+                try:
+                    source.backup(snapshot)
+                finally:
+                    source.close()
+                cls._snapshot, cls._snapshot_uri = snapshot, snapshot_uri
+            return cls._snapshot_uri
+
+    @classmethod
+    def _close_connections(cls) -> None:
+        with cls._connections_lock:
+            for conn in cls._connections:
+                conn.close()
+            cls._connections.clear()
+            cls._local = threading.local()
+        with cls._snapshot_lock:
+            if cls._snapshot is not None:
+                cls._snapshot.close()
+                cls._snapshot = None
 
     # STUFF RELATED TO SUPPORT CARDS
     # TODO: get chain events & random events
 
-    def get_all_support_cards(self, existing_support_cards: Optional[List[Dict]] = []) -> List[Dict]:
+    def get_all_support_cards(self, existing_support_cards: Optional[List[Dict]] = [], bulk: bool = True, fingerprints: Optional[Dict[int, str]] = None, jobs: int = 1, on_card: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
         """
         Retrieve all support cards from the database, skipping any whose 'id' is present in the supplied existing_support_cards list.
         Args:
             existing_support_cards (Optional[List[Dict]]): List of support card dicts to skip (by 'id').
+            bulk (bool): Load all source tables up front with a handful of set-based queries and assemble
+                the cards in memory. When False every card is queried one by one (same output, much slower).
+            fingerprints (Optional[Dict[int, str]]): Card fingerprints from the previous run (see card_fingerprints).
+                When given, an existing card is only skipped if its source rows still hash to the same
+                fingerprint; stale cards are rebuilt and replace the old dict at the same position.
+            jobs (int): Build the cards in this many worker processes, each with its own connection.
+            on_card (Optional[Callable[[Dict], None]]): Called with every card dict of the result as soon as it is
+                final (the reused ones first, then each built one), e.g. to stream cards to the next stage.
         Returns:
             List[Dict]: List of new support card dicts not in existing_support_cards.
         """
-        if not self._db_path:
-            raise ValueError("Database path not configured.")
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         cursor.execute('SELECT id, chara_id AS chara_id_card, rarity, effect_table_id, unique_effect_id, command_id, skill_set_id, support_card_type FROM support_card_data')
         result = cursor.fetchall()
-        conn.close()
         
         # Initialize support_cards as empty list if existing_support_cards is None
         support_cards = existing_support_cards if existing_support_cards is not None else []
 
         # Build a set of existing IDs for fast lookup
         existing_ids = set()
+        # Position of each existing card dict, so stale ones can be replaced in place
+        existing_positions = {}
         if existing_support_cards is not None:
-            for card in existing_support_cards:
+            for position, card in enumerate(existing_support_cards):
                 if isinstance(card, dict) and 'id' in card:
                     existing_ids.add(card['id'])
+                    existing_positions[card['id']] = position
                 elif isinstance(card, int):
                     existing_ids.add(card)
 
-        for row in tqdm(result):
-            keys = ['id', 'chara_id_card', 'rarity', 'effect_table_id', 'unique_effect_id', 'command_id', 'skill_set_id', 'support_card_type']
-            row_dict = dict(zip(keys, row))
+        tables = self._load_bulk_tables() if bulk or fingerprints is not None else None
+        if tables is not None:
+            self._card_fingerprints = {row[0]: self._card_fingerprint(row, tables) for row in result}
+        if fingerprints is not None:
+            existing_ids = {id_ for id_ in existing_ids if fingerprints.get(id_) == self._card_fingerprints.get(id_)}
+        if not bulk:
+            tables = None
+
+        if on_card is None:
+            on_card = lambda card: None
+        for card in support_cards:
+            if isinstance(card, dict) and card.get('id') in existing_ids:
+                on_card(card)
+
+        pending = [row for row in result if row[0] not in existing_ids]  # Skip if already present (and unchanged, when fingerprints are given)
+        if jobs > 1 and len(pending) > 1:
+            built = self._build_cards_in_processes(pending, tables, jobs, on_card)
+        else:
+            built = []
+            for row in tqdm(pending):
+                built.append(self._build_card(row, tables))
+                on_card(built[-1])
+
+        for row_dict in built:
             id_ = row_dict['id']
-            if id_ in existing_ids:
-                continue  # Skip if already present
-            rarity = row_dict['rarity']
-            effect_table_id = row_dict['effect_table_id']
-            unique_effect_id = row_dict['unique_effect_id']
-            command_id = row_dict['command_id']
-            support_card_type = row_dict['support_card_type']
+            if id_ in existing_positions:
+                support_cards[existing_positions[id_]] = row_dict
+            else:
+                support_cards.append(row_dict)
+        return support_cards
+
+    def _build_card(self, row: tuple, tables: Optional[Dict[str, Dict]]) -> Dict:
+        """Build one card from its support_card_data row, from the bulk tables or with per-card queries when tables is None."""
+        keys = ['id', 'chara_id_card', 'rarity', 'effect_table_id', 'unique_effect_id', 'command_id', 'skill_set_id', 'support_card_type']
+        row_dict = dict(zip(keys, row))
+        id_ = row_dict['id']
+        rarity = row_dict['rarity']
+        effect_table_id = row_dict['effect_table_id']
+        unique_effect_id = row_dict['unique_effect_id']
+        command_id = row_dict['command_id']
+        support_card_type = row_dict['support_card_type']
+        if tables is None:
             effects = self.get_support_card_effects(card_id=effect_table_id, rarity=rarity)
             unique_effects_raw = []
             if unique_effect_id != 0:
                 unique_effects_raw = self.get_support_card_unique_effects(card_id=unique_effect_id, rarity=rarity)
-            
-            # Apply unique effects to base effects (multiplicative stacking)
-            effects = self._apply_unique_effects_to_base(effects, unique_effects_raw, rarity)
-            
-            row_dict["id"] = id_
-            row_dict["card_chara_name"] = self.get_uma_name(id_)
-            prefered_type = self._types.get(command_id, (None, None))
-            if support_card_type == 3:  # Buddy cards operate uniquely and don't have a "preferred type" in the same way, so we can set it to None or a special value
-                prefered_type = (6, "Buddy")
-
-            row_dict["prefered_type_id"] = prefered_type[0]
-            row_dict["prefered_type"] = prefered_type[1]
-            row_dict["effects"] = effects
-            row_dict["hints_table"] = self.get_support_card_hints(card_id=id_)
-            row_dict["hints_event_table"] = []  # Will be populated from events
-
-            if unique_effect_id == 0:
-                row_dict["unique_effect_id"] = None
-            else:
-                row_dict["unique_effects"] = unique_effects_raw
+            card_chara_name = self.get_uma_name(id_)
+            hints_table = self.get_support_card_hints(card_id=id_)
+        else:
+            effects = self._build_effect_entries(tables["effects"].get(effect_table_id, []), rarity, self.get_type_name, tables["effect_levels"].get(effect_table_id, []))
+            unique_effects_raw = []
+            if unique_effect_id != 0:
+                unique_effects_raw = self._build_unique_effects(tables["unique_effects"].get(unique_effect_id), rarity, self.get_type_name)
+            card_chara_name = self.get_uma_name(id_)
+            hints_table = self._build_hints(tables["hints"].get(id_, []), lambda skill_id: self._copy_skill(tables["skills"][skill_id]))
+        
+        # Apply unique effects to base effects (multiplicative stacking)
+        effects = self._apply_unique_effects_to_base(effects, unique_effects_raw, rarity)
+        
+        row_dict["id"] = id_
+        row_dict["card_chara_name"] = card_chara_name
+        prefered_type = self._types.get(command_id, (None, None))
+        if support_card_type == 3:  # Buddy cards operate uniquely and don't have a "preferred type" in the same way, so we can set it to None or a special value
+            prefered_type = (6, "Buddy")
 
-            support_cards.append(row_dict)
-        return support_cards
+        row_dict["prefered_type_id"] = prefered_type[0]
+        row_dict["prefered_type"] = prefered_type[1]
+        row_dict["effects"] = effects
+        row_dict["hints_table"] = hints_table
+        row_dict["hints_event_table"] = []  # Will be populated from events
+
+        if unique_effect_id == 0:
+            row_dict["unique_effect_id"] = None
+        else:
+            row_dict["unique_effects"] = unique_effects_raw
+        return row_dict
+
+    def _build_cards_in_processes(self, rows: List[tuple], tables: Optional[Dict[str, Dict]], jobs: int, on_card: Callable[[Dict], None]) -> List[Dict]:
+        """
+        Split rows into contiguous shards and build them in a pool of worker processes, each with
+        its own read-only connection. Results are merged back in the original row order; on_card
+        gets the cards of each shard as soon as it completes.
+        Workers are spawned rather than forked: a forked worker would inherit this process's open
+        SQLite connections (and any running threads' state), which SQLite doesn't support.
+        The bulk tables and text index are handed to each worker once, so no worker scans the
+        source tables again.
+        """
+        # A few shards per worker so one slow shard doesn't leave the others idle
+        shard_count = min(len(rows), jobs * 4)
+        shard_size = -(-len(rows) // shard_count)
+        shards = [rows[start:start + shard_size] for start in range(0, len(rows), shard_size)]
+
+        results: List[Optional[List[Dict]]] = [None] * len(shards)
+        text_index = self.text_index() if tables is not None else None
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"), initializer=_init_card_worker,
+                                 initargs=(self._db_path, self._open_mode, tables, text_index)) as executor:
+            futures = {
+                executor.submit(_build_card_shard, shard): index
+                for index, shard in enumerate(shards)
+            }
+            with tqdm(total=len(rows)) as progress:
+                for future in as_completed(futures):
+                    index = futures[future]
+                    results[index] = future.result()
+                    for card in results[index]:
+                        on_card(card)
+                    progress.update(len(shards[index]))
+        return [card for shard in results for card in shard]
+
+    @property
+    def card_fingerprints(self) -> Dict[int, str]:
+        """Fingerprint of every card's source rows, as computed by the last bulk get_all_support_cards."""
+        return self._card_fingerprints
+
+    def _card_fingerprint(self, card_row: tuple, tables: Dict[str, Dict]) -> str:
+        """
+        Hash every source row that feeds into one card: its support_card_data row, effect table,
+        unique effect, hint gain rows, hinted skills and the text looked up for them.
+        """
+        card_id, _, _, effect_table_id, unique_effect_id = card_row[:5]
+        effects = tables["effects"].get(effect_table_id, [])
+        unique_effect = tables["unique_effects"].get(unique_effect_id)
+        hints = tables["hints"].get(card_id, [])
+
+        type_ids = {effect['type'] for effect in effects}
+        if unique_effect:
+            type_ids.update((unique_effect['type_0'], unique_effect['type_1']))
+        skill_ids = {hint['hint_value_1'] for hint in hints if hint['hint_gain_type'] == 0}
+
+        payload = [
+            self._fingerprint_version,
+            list(card_row),
+            effects,
+            unique_effect,
+            hints,
+            [tables["skills"].get(skill_id) for skill_id in sorted(skill_ids)],
+            self.get_uma_name(card_id),
+            [(type_id, self.get_type_name(type_id)) for type_id in sorted(type_ids)],
+        ]
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
 
     def _apply_unique_effects_to_base(self, base_effects: List[Dict], unique_effects: List[Dict], rarity: int) -> List[Dict]:
         """Apply unique effects to base effects with multiplicative stacking."""
@@ -190,110 +434,106 @@ class Database:
         
         return base_effects
 
+    def text_index(self) -> TextIndex:
+        """All text_data lookups go through this index, loaded on first use."""
+        if self._text_index is None:
+            Database._text_index = TextIndex.load(self._connection(), self._db_path, persist=self._persist_text_index)
+        return self._text_index
+
     def get_type_name(self, type_id: int) -> Optional[str]:
-        if not self._db_path:
-            raise ValueError("Database path not configured.")
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT text FROM text_data WHERE category=151 AND "index"=?', (type_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
+        return self.text_index().get(151, type_id)
     
     def get_uma_name(self, uma_id: int) -> Optional[str]:
-        if not self._db_path:
-            raise ValueError("Database path not configured.")
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
         # category=78 returns the support card's display name (works for all types incl. Buddy)
-        cursor.execute('SELECT text FROM text_data WHERE category=78 AND "index"=?', (uma_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
+        return self.text_index().get(78, uma_id)
 
     def get_skill_text(self, skill_id: int, text_type: str) -> Optional[str]:
-        if not self._db_path:
-            raise ValueError("Database path not configured.")
-
         category = 48 if text_type == "description" else 47
+        return self.text_index().get(category, skill_id)
 
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT text FROM text_data WHERE category=? AND "index"=?', (category, skill_id))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
-
-    def get_support_card_effects(self, card_id: int, rarity: int) -> List[Dict]:
-        if not self._db_path:
-            raise ValueError("Database path not configured.")
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-       
-        cursor.execute('''
+    _effect_table_sql = '''
             SELECT 
                 id, type, init, limit_lv5, limit_lv10, limit_lv15, limit_lv20, 
                 limit_lv25, limit_lv30, limit_lv35, limit_lv40, limit_lv45, limit_lv50
-            FROM support_card_effect_table
-            WHERE id=?
-        ''', (card_id,))
+            FROM support_card_effect_table'''
+
+    _unique_effect_sql = '''
+            SELECT
+                id, lv, type_0, value_0,
+                value_0_1, value_0_2, value_0_3, value_0_4,
+                type_1, value_1,
+                value_1_1, value_1_2, value_1_3, value_1_4
+            FROM support_card_unique_effect'''
+
+    _hint_gain_sql = '''
+            SELECT 
+                hint_group, hint_gain_type, hint_value_1, hint_value_2
+            FROM single_mode_hint_gain'''
+
+    _skill_sql = '''SELECT 
+                       id, 
+                       rarity, 
+                       group_id,
+                       icon_id, 
+                       grade_value, 
+                       condition_1, 
+                       float_ability_time_1 AS skill_time_active, 
+                       float_cooldown_time_1 AS skill_cooldown_time, 
+                       ability_type_1_1 AS ability_type, 
+                       float_ability_value_1_1 AS ability_value
+                       FROM skill_data'''
+
+    _effect_level_columns = (
+        'init', 'limit_lv5', 'limit_lv10', 'limit_lv15', 'limit_lv20', 'limit_lv25',
+        'limit_lv30', 'limit_lv35', 'limit_lv40', 'limit_lv45', 'limit_lv50',
+    )
+    _limit_break_keys = ('0lb', '1lb', '2lb', '3lb', 'mlb')
+    # Index of the level column holding the 0lb value (max level 20/25/30 for R/SR/SSR)
+    _rarity_level_offsets = {1: 4, 2: 5, 3: 6}
+
+    def get_support_card_effects(self, card_id: int, rarity: int) -> List[Dict]:
+        cursor = self._connection().cursor()
+       
+        cursor.execute(self._effect_table_sql + ' WHERE id=?', (card_id,))
         rows = cursor.fetchall()
-        conn.close()
-        entries = []
         columns = [desc[0] for desc in cursor.description]
-        for row in rows:
-            row_dict = dict(zip(columns, row))
-            values_for_levels = lerp_levels([row_dict['init'], row_dict['limit_lv5'], row_dict['limit_lv10'], row_dict['limit_lv15'], row_dict['limit_lv20'], row_dict['limit_lv25'], row_dict['limit_lv30'], row_dict['limit_lv35'], row_dict['limit_lv40'], row_dict['limit_lv45'], row_dict['limit_lv50']])
+        return self._build_effect_entries([dict(zip(columns, row)) for row in rows], rarity, self.get_type_name)
+
+    def _build_effect_entries(self, rows: List[Dict], rarity: int, type_name: Callable[[int], Optional[str]], levels: Optional[List[List[int]]] = None) -> List[Dict]:
+        """
+        Turn effect table rows into per limit break entries. levels holds each row's interpolated
+        level values when they were already computed for the whole table (see _load_bulk_tables).
+        """
+        if levels is None:
+            levels = lerp_levels_batch([[row_dict[column] for column in self._effect_level_columns] for row_dict in rows]).tolist()
+        # Level columns that hold 0lb..mlb for this rarity; unknown rarities get no values
+        offset = self._rarity_level_offsets.get(rarity)
+        entries = []
+        for row_dict, values_for_levels in zip(rows, levels):
             entry = {}
-            if rarity == 1:
-                entry['0lb'] = values_for_levels[4]
-                entry['1lb'] = values_for_levels[5]
-                entry['2lb'] = values_for_levels[6]
-                entry['3lb'] = values_for_levels[7]
-                entry['mlb'] = values_for_levels[8]
-            elif rarity == 2:
-                entry['0lb'] = values_for_levels[5]
-                entry['1lb'] = values_for_levels[6]
-                entry['2lb'] = values_for_levels[7]
-                entry['3lb'] = values_for_levels[8]
-                entry['mlb'] = values_for_levels[9]
-            elif rarity == 3:
-                entry['0lb'] = values_for_levels[6]
-                entry['1lb'] = values_for_levels[7]
-                entry['2lb'] = values_for_levels[8]
-                entry['3lb'] = values_for_levels[9]
-                entry['mlb'] = values_for_levels[10]
+            if offset is not None:
+                entry.update(zip(self._limit_break_keys, values_for_levels[offset:offset + len(self._limit_break_keys)]))
 
             entry['type'] = row_dict['type']
-            entry['type_name'] = self.get_type_name(row_dict['type'])
+            entry['type_name'] = type_name(row_dict['type'])
             entries.append(entry)
         return entries
 
     def get_support_card_unique_effects(self, card_id: int, rarity: int) -> List[Dict]:
-        if not self._db_path:
-            raise ValueError("Database path not configured.")
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
        
-        cursor.execute('''
-            SELECT
-                id, lv, type_0, value_0,
-                value_0_1, value_0_2, value_0_3, value_0_4,
-                type_1, value_1,
-                value_1_1, value_1_2, value_1_3, value_1_4
-            FROM support_card_unique_effect
-            WHERE id=?
-        ''', (card_id,))
+        cursor.execute(self._unique_effect_sql + ' WHERE id=?', (card_id,))
         row = cursor.fetchone()
-        conn.close()
         columns = [desc[0] for desc in cursor.description]
-        if row:
-            row_dict = dict(zip(columns, row))
+        return self._build_unique_effects(dict(zip(columns, row)) if row else None, rarity, self.get_type_name)
+
+    def _build_unique_effects(self, row_dict: Optional[Dict], rarity: int, type_name: Callable[[int], Optional[str]]) -> List[Dict]:
+        if row_dict:
 
             def _type_name(t: int) -> str:
                 # Prefer the master DB's label; fall back to our table for the
                 # special IDs (>=101) that have no entry in text_data cat 151.
-                named = self.get_type_name(t)
+                named = type_name(t)
                 if named:
                     return named
                 return self._special_unique_effect_type_names.get(t, f"Unknown Unique Effect ({t})")
@@ -338,30 +578,23 @@ class Database:
         return []
 
     def get_support_card_hints(self, card_id: int) -> List[Dict]:
-        if not self._db_path:
-            raise ValueError("Database path not configured.")
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
        
-        cursor.execute('''
-            SELECT 
-                hint_group, hint_gain_type, hint_value_1, hint_value_2
-            FROM single_mode_hint_gain
-            WHERE support_card_id=?
-        ''', (card_id,))
+        cursor.execute(self._hint_gain_sql + ' WHERE support_card_id=?', (card_id,))
         rows = cursor.fetchall()
-        conn.close()
 
         columns = [desc[0] for desc in cursor.description]
+        return self._build_hints([dict(zip(columns, row)) for row in rows], self.get_skill_by_id)
+
+    def _build_hints(self, rows: List[Dict], skill_by_id: Callable[[int], Optional[Dict]]) -> List[Dict]:
         all_hints = {}
-        for row in rows:
-            row_dict = dict(zip(columns, row))
+        for row_dict in rows:
             index = row_dict['hint_group']
             if row_dict['hint_gain_type'] == 0:
                 all_hints[index] = {
                     "type": "skill_hint",
                     "skill_id": row_dict['hint_value_1'],
-                    "skill_data": self.get_skill_by_id(row_dict['hint_value_1']),
+                    "skill_data": skill_by_id(row_dict['hint_value_1']),
                     "hint_level": row_dict['hint_value_2']
                 }
             else:
@@ -377,33 +610,133 @@ class Database:
         return list(all_hints.values())
 
     def get_skill_by_id(self, skill_id: int) -> Optional[Dict]:
-        if not self._db_path:
-            raise ValueError("Database path not configured.")
-        conn = sqlite3.connect(self._db_path)
-        cursor = conn.cursor()
-        cursor.execute('''SELECT 
-                       id, 
-                       rarity, 
-                       group_id,
-                       icon_id, 
-                       grade_value, 
-                       condition_1, 
-                       float_ability_time_1 AS skill_time_active, 
-                       float_cooldown_time_1 AS skill_cooldown_time, 
-                       ability_type_1_1 AS ability_type, 
-                       float_ability_value_1_1 AS ability_value
-                       FROM skill_data WHERE id=?''', (skill_id,))
+        found, skill = self._skill_cache.lookup(skill_id)
+        if found:
+            return skill
+        cursor = self._connection().cursor()
+        cursor.execute(self._skill_sql + ' WHERE id=?', (skill_id,))
         row = cursor.fetchone()
-        conn.close()
+        result = None
         if row:
             columns = [desc[0] for desc in cursor.description]
-            skill_name = self.get_skill_text(skill_id, "name")
-            skill_desc = self.get_skill_text(skill_id, "description")
-            result = dict(zip(columns, row))
-            result['skill_name'] = skill_name
-            result['skill_desc'] = skill_desc
-            return result
-        return None
+            result = self._skill_from_row(dict(zip(columns, row)))
+        self._skill_cache.store(skill_id, result)
+        return result
+
+    def get_skills_by_ids(self, skill_ids: Iterable[int]) -> Dict[int, Optional[Dict]]:
+        """
+        Resolve many skills at once: cache hits are served directly and all misses are
+        fetched with a single IN query (chunked below SQLite's bound parameter limit).
+        Returns a dict keyed by every requested id, with None for ids not in skill_data.
+        """
+        result: Dict[int, Optional[Dict]] = {}
+        missing = []
+        for skill_id in dict.fromkeys(skill_ids):
+            found, skill = self._skill_cache.lookup(skill_id)
+            if found:
+                result[skill_id] = skill
+            else:
+                missing.append(skill_id)
+
+        cursor = self._connection().cursor()
+        for start in range(0, len(missing), self._max_query_params):
+            chunk = missing[start:start + self._max_query_params]
+            cursor.execute(self._skill_sql + f' WHERE id IN ({", ".join("?" for _ in chunk)})', chunk)
+            columns = [desc[0] for desc in cursor.description]
+            fetched = {}
+            for row in cursor.fetchall():
+                row_dict = dict(zip(columns, row))
+                fetched.setdefault(row_dict['id'], row_dict)
+            resolved = [(skill_id, self._skill_from_row(fetched[skill_id]) if skill_id in fetched else None) for skill_id in chunk]
+            self._skill_cache.store_many(resolved)
+            result.update(resolved)
+        return result
+
+    def skill_cache_stats(self) -> Dict[str, int]:
+        return self._skill_cache.stats()
+
+    def _skill_from_row(self, row_dict: Dict) -> Dict:
+        row_dict['skill_name'] = self.get_skill_text(row_dict['id'], "name")
+        row_dict['skill_desc'] = self.get_skill_text(row_dict['id'], "description")
+        return row_dict
+
+    # BULK EXTRACTION
+
+    def _load_bulk_tables(self) -> Dict[str, Dict]:
+        """
+        Load every source table get_all_support_cards needs in a handful of set-based queries.
+        Rows are grouped by the key the per-card queries filter on, in the order those
+        point queries return them, so the assembled cards are identical.
+        """
+        cursor = self._connection().cursor()
+
+        # (id, type) is the primary key, which is the order the per-card lookup walks
+        cursor.execute(self._effect_table_sql + ' ORDER BY id, type')
+        columns = [desc[0] for desc in cursor.description]
+        rows = cursor.fetchall()
+        # Interpolate the level columns of the whole table in one vectorized pass
+        level_slice = slice(columns.index(self._effect_level_columns[0]), columns.index(self._effect_level_columns[-1]) + 1)
+        all_levels = lerp_levels_batch([row[level_slice] for row in rows]).tolist()
+        effects: Dict[int, List[Dict]] = {}
+        effect_levels: Dict[int, List[List[int]]] = {}
+        for row, levels in zip(rows, all_levels):
+            row_dict = dict(zip(columns, row))
+            effects.setdefault(row_dict['id'], []).append(row_dict)
+            effect_levels.setdefault(row_dict['id'], []).append(levels)
+
+        cursor.execute(self._unique_effect_sql)
+        columns = [desc[0] for desc in cursor.description]
+        unique_effects: Dict[int, Dict] = {}
+        for row in cursor.fetchall():
+            row_dict = dict(zip(columns, row))
+            unique_effects.setdefault(row_dict['id'], row_dict)
+
+        cursor.execute('''
+            SELECT 
+                support_card_id, hint_group, hint_gain_type, hint_value_1, hint_value_2
+            FROM single_mode_hint_gain
+        ''')
+        columns = [desc[0] for desc in cursor.description]
+        hints: Dict[int, List[Dict]] = {}
+        for row in cursor.fetchall():
+            row_dict = dict(zip(columns, row))
+            hints.setdefault(row_dict.pop('support_card_id'), []).append(row_dict)
+
+        # Only skills that some card hints; this also warms the skill cache for event hints
+        skills = self.get_skills_by_ids(
+            row_dict['hint_value_1']
+            for card_hints in hints.values()
+            for row_dict in card_hints
+            if row_dict['hint_gain_type'] == 0
+        )
+
+        return {
+            "effects": effects,
+            "effect_levels": effect_levels,
+            "unique_effects": unique_effects,
+            "hints": hints,
+            "skills": skills,
+        }
+
+    @staticmethod
+    def _copy_skill(skill: Optional[Dict]) -> Optional[Dict]:
+        # Every hint gets its own dict, like a fresh get_skill_by_id call would return
+        return dict(skill) if skill is not None else None
+
+# Bulk tables of the worker process, set once by _init_card_worker
+_worker_tables: Optional[Dict[str, Dict]] = None
+
+def _init_card_worker(db_path: str, open_mode: str, tables: Optional[Dict[str, Dict]], text_index: Optional[TextIndex]) -> None:
+    """Process pool initializer: the parent's bulk tables and text index, and the worker's own (lazy) connection."""
+    global _worker_tables
+    Database.configure(db_path, open_mode=open_mode)
+    Database._text_index = text_index
+    _worker_tables = tables
+
+def _build_card_shard(rows: List[tuple]) -> List[Dict]:
+    """Process pool entry point: build the cards for one shard of support_card_data rows."""
+    database = Database()
+    return [database._build_card(row, _worker_tables) for row in rows]
 
 # Convenience function for external use
 def get_support_cards() -> List[Dict]:
@@ -0,0 +1,103 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from helper import write_atomic
+
+if TYPE_CHECKING:
+    from asset_manifest import AssetManifest
+    from fetcher import Fetcher
+
+
+class DownloadQueue:
+    """
+    One download queue for every image of a run: a single thread pool sharing the fetcher's pooled
+    session (which also throttles per host), one progress bar and one summary. Several producers
+    (e.g. the card-images and skill-icons stages) can feed it jobs at the same time.
+    """
+
+    def __init__(self, fetcher: 'Fetcher', workers: Optional[int] = None, manifest: Optional['AssetManifest'] = None, refresh: bool = False) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+        from tqdm import tqdm
+        self.fetcher = fetcher
+        self.manifest = manifest
+        self.refresh = refresh
+        self.results = {"up to date": 0, "downloaded": 0, "unchanged": 0, "failed": 0}
+        self._executor = ThreadPoolExecutor(max_workers=workers or fetcher.max_concurrency)
+        self._progress = tqdm(total=0, unit="img")
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'DownloadQueue':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def download(self, jobs: Iterable[Tuple[str, str, Dict]]) -> List[str]:
+        """
+        Queue every (url, path, context) job that is missing (or, with a manifest, no longer
+        matches its record); with refresh, intact files are revalidated too. jobs may be a lazy
+        iterable; downloads start as soon as each job arrives. Blocks until these jobs are done
+        and returns the paths of all of them.
+        """
+        paths = []
+        futures = []
+        for url, path, context in jobs:
+            paths.append(path)
+            intact = self._intact(url, path)
+            if intact and not self.refresh:
+                with self._lock:
+                    self.results["up to date"] += 1
+                continue
+
+            with self._lock:
+                self._progress.total += 1
+                self._progress.refresh()
+            future = self._executor.submit(self._download_one, url, path, context, intact)
+            future.add_done_callback(self._done)
+            futures.append(future)
+
+        for future in futures:
+            future.result()
+        return paths
+
+    def close(self) -> None:
+        """Wait for the queued downloads and print the summary."""
+        self._executor.shutdown()
+        self._progress.close()
+        print(f"Images: {self.results['up to date']} up to date, {self.results['downloaded']} downloaded, {self.results['unchanged']} unchanged, {self.results['failed']} failed")
+
+    def _intact(self, url: str, path: str) -> bool:
+        if self.manifest is None:
+            return os.path.exists(path)
+        entry = self.manifest.entry(path)
+        if entry is None and os.path.exists(path):
+            # Not adopted (so fetched again) unless the file is a complete image
+            return self.manifest.adopt(path, url)
+        return entry is not None and entry["url"] == url and self.manifest.verify(path)
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self.results[future.result()] += 1
+            self._progress.update()
+
+    def _download_one(self, url: str, path: str, context: Dict, revalidate: bool = False) -> str:
+        try:
+            headers = self.manifest.conditional_headers(path) if revalidate else None
+            response = self.fetcher.get(url, headers, **context)
+            if response.status_code == 304:
+                return "unchanged"
+            response.raise_for_status()
+
+            with write_atomic(path, 'wb') as f:
+                f.write(response.content)
+            if self.manifest is not None:
+                self.manifest.record(path, url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return "downloaded"
+        except Exception as e:
+            from fetcher import FetchError
+            from tqdm import tqdm
+            tqdm.write(f"Failed to download {url}: {e}")
+            if not isinstance(e, FetchError):
+                self.fetcher.record_failure(url, str(e), **context)
+            return "failed"
@@ -0,0 +1,93 @@
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from helper import write_atomic
+
+LIMIT_BREAKS = ("0lb", "1lb", "2lb", "3lb", "mlb")
+
+
+class EffectArrays(NamedTuple):
+    """
+    Dense view of every card's effects.
+        values[card, effect_type, limit_break] -> effect value (0 where the card lacks the effect)
+        present[card, effect_type] -> whether the card has the effect at all
+    Row i describes card_ids[i], column j effect_types[j] / effect_type_names[j], and the last
+    axis follows LIMIT_BREAKS.
+    """
+    card_ids: np.ndarray
+    effect_types: np.ndarray
+    effect_type_names: List[str]
+    values: np.ndarray
+    present: np.ndarray
+
+    def card_index(self) -> Dict[int, int]:
+        return {int(card_id): i for i, card_id in enumerate(self.card_ids)}
+
+
+class EffectExporter:
+    """
+    Writes the card effects as plain uncompressed .npy files (one per array) in a directory, so
+    np.load(..., mmap_mode='r') maps them without copying or parsing. An .npz would be a zip and
+    can't be memory-mapped, hence the directory.
+    """
+
+    ARRAYS = ("card_ids", "effect_types", "values", "present")
+    META_FILE = "effects.json"
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    @staticmethod
+    def build(cards: List[Dict[str, Any]]) -> EffectArrays:
+        type_names: Dict[int, str] = {}
+        for card in cards:
+            for effect in card.get("effects", []):
+                type_names.setdefault(effect["type"], effect["type_name"])
+        effect_types = np.array(sorted(type_names), dtype=np.int32)
+        column = {int(effect_type): j for j, effect_type in enumerate(effect_types)}
+
+        card_ids = np.array([card["id"] for card in cards], dtype=np.int32)
+        # Some values are fractional (e.g. friendship bonus 37.5); float64 holds every JSON value exactly
+        values = np.zeros((len(cards), len(effect_types), len(LIMIT_BREAKS)), dtype=np.float64)
+        present = np.zeros((len(cards), len(effect_types)), dtype=bool)
+        for i, card in enumerate(cards):
+            for effect in card.get("effects", []):
+                j = column[effect["type"]]
+                values[i, j] = [effect[limit_break] for limit_break in LIMIT_BREAKS]
+                present[i, j] = True
+        return EffectArrays(card_ids, effect_types, [type_names[int(t)] for t in effect_types], values, present)
+
+    def write(self, cards: List[Dict[str, Any]]) -> EffectArrays:
+        arrays = self.build(cards)
+        os.makedirs(self.directory, exist_ok=True)
+        for name in self.ARRAYS:
+            path = os.path.join(self.directory, f"{name}.npy")
+            with write_atomic(path, 'wb') as f:
+                np.save(f, getattr(arrays, name))
+
+        # Written last; load() checks it against the arrays, so a half-written export is caught
+        meta = {
+            "shape": list(arrays.values.shape),
+            "axes": ["card", "effect_type", "limit_break"],
+            "limit_breaks": list(LIMIT_BREAKS),
+            "effect_type_names": arrays.effect_type_names,
+        }
+        path = os.path.join(self.directory, self.META_FILE)
+        with write_atomic(path) as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        return arrays
+
+    def load(self, mmap: bool = True) -> Optional[EffectArrays]:
+        """Load an export, memory-mapped read-only by default. None if there is no export."""
+        try:
+            with open(os.path.join(self.directory, self.META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        loaded = {name: np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode='r' if mmap else None) for name in self.ARRAYS}
+        if list(loaded["values"].shape) != meta["shape"]:
+            raise ValueError(f"Effect export in {self.directory} is inconsistent: values has shape {loaded['values'].shape}, expected {meta['shape']}")
+        return EffectArrays(loaded["card_ids"], loaded["effect_types"], meta["effect_type_names"], loaded["values"], loaded["present"])
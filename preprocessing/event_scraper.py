@@ -1,186 +1,397 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-import requests
-from bs4 import BeautifulSoup
 import json
+import re
 
+from helper import parse_signed_int
+from page_cache import PageCache
+
+if TYPE_CHECKING:
+    from fetcher import Fetcher
+
+
+_NEXT_DATA_MARKER = b'id="__NEXT_DATA__"'
+_EVENT_DATA_PATH = ("props", "pageProps", "eventData")
+_json_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+def _member_value(text: str, index: int, name: str) -> int:
+    """
+    Index where the value of key `name` starts in the JSON object at text[index:], or -1 if the
+    object has no such key. Only the values of the keys before it are decoded (to skip them).
+    Raises ValueError on malformed JSON.
+    """
+    index = _whitespace.match(text, index).end()
+    if text[index:index + 1] != '{':
+        return -1
+    index = _whitespace.match(text, index + 1).end()
+    if text[index:index + 1] == '}':
+        return -1
+    while True:
+        key, index = _json_decoder.raw_decode(text, index)
+        index = _whitespace.match(text, index).end()
+        if text[index:index + 1] != ':':
+            raise ValueError(f"Expected ':' at {index}")
+        index = _whitespace.match(text, index + 1).end()
+        if key == name:
+            return index
+        _, index = _json_decoder.raw_decode(text, index)
+        index = _whitespace.match(text, index).end()
+        if text[index:index + 1] != ',':
+            return -1
+        index = _whitespace.match(text, index + 1).end()
+
+
+def fast_extract_event_payload(page: bytes) -> Optional[str]:
+    """
+    Slice the __NEXT_DATA__ script straight out of the raw page and decode only its
+    props.pageProps.eventData object, instead of building a BeautifulSoup tree and json-decoding
+    all of the page props. Returns None when the page doesn't look as expected, so callers can
+    fall back to a full parse.
+    """
+    marker = page.find(_NEXT_DATA_MARKER)
+    if marker == -1:
+        return None
+    start = page.find(b'>', marker) + 1
+    end = page.find(b'</script>', start)
+    if start == 0 or end == -1:
+        return None
+    script = page[start:end].decode('utf-8')
+
+    # Walk down the key path; an eventData key nested anywhere else in the props doesn't match
+    value_start = 0
+    for name in _EVENT_DATA_PATH:
+        value_start = _member_value(script, value_start, name)
+        if value_start == -1:
+            return None
+    event_data, _ = _json_decoder.raw_decode(script, value_start)
+    if not isinstance(event_data, dict) or not isinstance(event_data.get("en"), str):
+        return None
+    return event_data["en"]
+
+
+# Reward type codes used by gametora's event data
+REWARD_TYPES = {
+    "sp": "Speed",
+    "st": "Stamina",
+    "po": "Power",
+    "gu": "Guts",
+    "in": "Intelligence",
+    "en": "Energy",
+    "sk": "Skill Hint",
+    "sr": "Skill Choice",
+    "bo": "Bond",
+    "pt": "Potential",
+    "mo": "Mood",
+    "5s": "All Stats",
+}
+
+
+def _reward_amount(value: Any) -> Optional[int]:
+    """Numeric value of a reward ("+10", "-5", "5/10" -> 7), or None when it isn't a number."""
+    try:
+        return parse_signed_int(value)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _with_amount(reward_entry: dict) -> dict:
+    # Decoded once here so consumers don't have to re-parse the value string
+    amount = _reward_amount(reward_entry["value"])
+    if amount is not None:
+        reward_entry["amount"] = amount
+    return reward_entry
+
+
+def _decode_regular_reward(reward: dict) -> Iterator[dict]:
+    reward_entry = {"type": REWARD_TYPES.get(reward.get("t"), reward.get("t")), "value": reward.get("v")}
+    if "d" in reward:
+        reward_entry["detail"] = reward["d"]
+    yield _with_amount(reward_entry)
+
+
+def _decode_skill_choice_reward(reward: dict) -> Iterator[dict]:
+    # "sr" lists every skill on offer in its detail array; each becomes its own reward
+    if not isinstance(reward.get("d"), list):
+        yield from _decode_regular_reward(reward)
+        return
+    for skill_choice in reward["d"]:
+        yield _with_amount({
+            "type": "Skill Choice",
+            "value": skill_choice.get("v"),
+            "detail": skill_choice.get("d")
+        })
+
+
+# Reward type code -> decoder; anything not listed is a plain {type, value, detail} reward
+_REWARD_DECODERS = {
+    "sr": _decode_skill_choice_reward,
+}
+
+
+def _decode_choices(event_data: dict) -> List[dict]:
+    return [
+        {
+            "option": option.get("o"),
+            "rewards": [
+                decoded
+                for reward in option.get("r", [])
+                for decoded in _REWARD_DECODERS.get(reward.get("t"), _decode_regular_reward)(reward)
+            ],
+        }
+        for option in event_data.get("c", [])
+    ]
+
+
+class HintBatch:
+    """
+    Collects cards whose event hints still need resolving and resolves them with one bulk skill
+    lookup per `size` cards (or per flush()), then hands each card to on_card.
+    """
+
+    def __init__(self, scraper: 'EventScraper', on_card: Optional[Callable[[Dict[str, Any]], None]], size: int = 32) -> None:
+        self.scraper = scraper
+        self.on_card = on_card
+        self.size = size
+        self.cards: List[Dict[str, Any]] = []
+
+    def add(self, card: Dict[str, Any]) -> None:
+        self.cards.append(card)
+        if len(self.cards) >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        cards, self.cards = self.cards, []
+        if cards:
+            self.scraper.resolve_event_hints(cards)
+        if self.on_card is not None:
+            for card in cards:
+                self.on_card(card)
 
 
 class EventScraper:
     from typing import List, Dict, Any
-    def get_events_for_support_cards(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        events = []
-        for card in data:
-            if not card.get('card_chara_name'):
-                print(f"  Skipping card {card['id']} - no character name")
-                events.append(card)
-                continue
-            card_url_postfix = f"{card['id']} {card['card_chara_name']}".lower().replace('.', '').replace(' ', '-')
-            full_url = f"https://gametora.com/umamusume/supports/{card_url_postfix}"
-            print(f"Fetching: {full_url}")
-            if 'all_events' in card:
-                print(f"  Skipping {card['card_chara_name']} ({card['id']}) - already has events")
-                events.append(card)
-                continue
+
+    BASE_URL = "https://gametora.com"
+
+    def __init__(self, base_url: str = BASE_URL, concurrency: int = 8, fetcher: Optional['Fetcher'] = None, cache: Optional[PageCache] = None, offline: bool = False) -> None:
+        """
+        Args:
+            base_url (str): Site to scrape; point it at a local stub server to test against recorded pages.
+            concurrency (int): Maximum number of pages in flight at the same time.
+            fetcher (Optional[Fetcher]): Shared fetch layer (throttling, retries, failure log); a default one is created if omitted.
+            cache (Optional[PageCache]): Keep extracted event payloads on disk and revalidate them
+                with conditional requests instead of downloading whole pages again.
+            offline (bool): Serve everything from cache and never touch the network.
+        """
+        if offline and cache is None:
+            raise ValueError("Offline scraping needs a page cache.")
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.fetcher = fetcher
+        self.cache = cache
+        self.offline = offline
+
+    def card_url(self, card: Dict[str, Any]) -> str:
+        card_url_postfix = f"{card['id']} {card['card_chara_name']}".lower().replace('.', '').replace(' ', '-')
+        return f"{self.base_url}/umamusume/supports/{card_url_postfix}"
+
+    def get_events_for_support_cards(self, data: Iterable[Dict[str, Any]], on_card: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        return asyncio.run(self.get_events_for_support_cards_async(data, on_card))
+
+    async def get_events_for_support_cards_async(self, data: Iterable[Dict[str, Any]], on_card: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch the event pages of all cards concurrently through the shared fetcher. Cards come back
+        in their input order. Cards whose page could not be fetched or parsed are kept without
+        'all_events' (and recorded in the fetcher's failures), so the next run picks them up again.
+        data may be a blocking iterable (e.g. a Stream fed by the extraction); cards are scraped as
+        they arrive. With on_card, the event hints of scraped cards are resolved in batches (see
+        HintBatch) as soon as a batch is full or nothing else is in flight, and each card is then
+        handed to on_card; otherwise the hints of all cards are resolved together.
+        """
+        if self.fetcher is None and not self.offline:
+            # requests is only loaded once something actually goes to the network
+            from fetcher import Fetcher
+            self.fetcher = Fetcher(max_concurrency=self.concurrency)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        hints = HintBatch(self, on_card)
+        in_flight = 0
+
+        async def scrape(card: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+            nonlocal in_flight
             try:
-                response = requests.get(full_url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                script_tag = soup.find('script', id='__NEXT_DATA__', type='application/json')
-                if script_tag:
-                    json_data = json.loads(script_tag.string)
-                    trimmed_data = json.loads(json_data["props"]["pageProps"]["eventData"]["en"])
-
-                    random_events = trimmed_data.get("random", [])
-                    chain_events = trimmed_data.get("arrows", [])
-                    special_events = trimmed_data.get("special", [])
-                    date_events = trimmed_data.get("dates") or trimmed_data.get("dates_random", [])
-
-                    if card['id'] == 30081:
-                        print(trimmed_data)
-
-                    card['all_events'] = {}
-                    card['all_events']['dates'] = self.parse_event_data(date_events)
-                    card['all_events']['chain_events'] = self.parse_event_data(chain_events)
-                    card['all_events']['random_events'] = self.parse_event_data(random_events)
-                    card['all_events']['special_events'] = self.parse_event_data(special_events)
-                    
-                    # Extract event hints and populate hints_event_table
-                    card['hints_event_table'] = self.extract_event_hints(card['all_events'])
-                    
-                    events.append(card)
-            except Exception as e:
-                print(e)
-        return events
+                card, scraped = await self._scrape_card(card, semaphore)
+            finally:
+                in_flight -= 1
+            if on_card is not None:
+                if scraped:
+                    hints.add(card)
+                else:
+                    on_card(card)
+                # Don't hold a partial batch back while waiting for more cards to arrive
+                if not in_flight:
+                    hints.flush()
+            return card, scraped
 
-    def parse_event_data(self, event_entries: list) -> list:
+        # Wait for the next card off the event loop, so the cards already started keep going
+        tasks = []
+        cards = iter(data)
+        end = object()
+        while (card := await asyncio.to_thread(next, cards, end)) is not end:
+            in_flight += 1
+            tasks.append(asyncio.create_task(scrape(card)))
+        results = await asyncio.gather(*tasks)
+        if on_card is None:
+            self.resolve_event_hints([card for card, scraped in results if scraped])
+        hints.flush()
+        return [card for card, _ in results]
 
-        key_skill_map = {
-            "sp": "Speed",
-            "st": "Stamina",
-            "po": "Power",
-            "gu": "Guts",
-            "in": "Intelligence",
-            "en": "Energy",
-            "sk": "Skill Hint",
-            "sr": "Skill Choice",
-            "bo": "Bond",
-            "pt": "Potential",
-            "mo": "Mood",
-            "5s": "All Stats",
-        }
+    async def _scrape_card(self, card: Dict[str, Any], semaphore: asyncio.Semaphore) -> Tuple[Dict[str, Any], bool]:
+        """Returns (card, whether its events were scraped just now)."""
+        if not card.get('card_chara_name'):
+            print(f"  Skipping card {card['id']} - no character name")
+            return card, False
+        full_url = self.card_url(card)
+        if 'all_events' in card:
+            print(f"  Skipping {card['card_chara_name']} ({card['id']}) - already has events")
+            return card, False
+        try:
+            payload = await self._fetch_event_payload(full_url, card['id'], semaphore)
+            if payload is None:
+                raise ValueError("no event data on the page")
+            return self.apply_event_payload(card, payload), True
+        except Exception as e:
+            print(e)
+            from fetcher import FetchError
+            if self.fetcher is not None and not isinstance(e, FetchError):
+                self.fetcher.record_failure(full_url, str(e), card_id=card['id'], kind="events")
+            return card, False
+
+    async def _fetch_event_payload(self, url: str, card_id: int, semaphore: asyncio.Semaphore) -> Optional[str]:
+        """The page's English event data (a JSON string), from the cache when it is still valid."""
+        entry = self.cache.get(url) if self.cache else None
+        if self.offline:
+            if entry is None:
+                print(f"  Not in page cache (offline): {url}")
+                return None
+            return entry["payload"]
+
+        async with semaphore:
+            print(f"Fetching: {url}")
+            response = await asyncio.to_thread(self.fetcher.get, url, PageCache.conditional_headers(entry), card_id=card_id, kind="events")
+        if response.status_code == 304 and entry is not None:
+            return entry["payload"]
+        response.raise_for_status()
+
+        payload = self.extract_event_payload(response.content)
+        if payload is not None and self.cache:
+            self.cache.put(url, payload, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return payload
+
+    def extract_event_payload(self, page: bytes) -> Optional[str]:
+        """The English eventData JSON string embedded in a card page's __NEXT_DATA__, or None if the page has none."""
+        try:
+            payload = fast_extract_event_payload(page)
+        except ValueError:
+            payload = None
+        if payload is not None:
+            return payload
+        return self.parse_event_payload(page.decode('utf-8', errors='replace'))
 
-        parsed_events = []
+    def parse_event_payload(self, html: str) -> Optional[str]:
+        """Slow path of extract_event_payload: full BeautifulSoup and JSON parse of the page."""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        script_tag = soup.find('script', id='__NEXT_DATA__', type='application/json')
+        if not script_tag:
+            return None
+        json_data = json.loads(script_tag.string)
+        return json_data["props"]["pageProps"]["eventData"]["en"]
+
+    def apply_event_payload(self, card: Dict[str, Any], payload: str) -> Dict[str, Any]:
+        """Parse a card's event data into card['all_events'] / card['hints_event_table']."""
+        trimmed_data = json.loads(payload)
+
+        random_events = trimmed_data.get("random", [])
+        chain_events = trimmed_data.get("arrows", [])
+        special_events = trimmed_data.get("special", [])
+        date_events = trimmed_data.get("dates") or trimmed_data.get("dates_random", [])
+
+        card['all_events'] = {}
+        card['all_events']['dates'] = self.parse_event_data(date_events)
+        card['all_events']['chain_events'] = self.parse_event_data(chain_events)
+        card['all_events']['random_events'] = self.parse_event_data(random_events)
+        card['all_events']['special_events'] = self.parse_event_data(special_events)
+        # hints_event_table is filled for the whole batch afterwards (resolve_event_hints)
+        return card
+
+    def parse_event_data(self, event_entries: list) -> list:
+        return list(self.iter_event_data(event_entries))
+
+    def iter_event_data(self, event_entries: Iterable[dict]) -> Iterator[dict]:
+        """Decode gametora event entries one at a time, including their history variants."""
         for entry in event_entries:
             event_obj = {
                 "name": entry.get("n"),
-                "choices": []
+                "choices": _decode_choices(entry)
             }
-            for option in entry.get("c", []):
-                option_obj = {"option": option.get("o"), "rewards": []}
-                for reward in option.get("r", []):
-                    reward_type = key_skill_map.get(reward.get("t"), reward.get("t"))
-                    
-                    # Special handling for "sr" (Skill Choice) type
-                    if reward.get("t") == "sr" and "d" in reward and isinstance(reward["d"], list):
-                        # Process each skill choice in the detail array
-                        for skill_choice in reward["d"]:
-                            skill_entry = {
-                                "type": "Skill Choice",
-                                "value": skill_choice.get("v"),
-                                "detail": skill_choice.get("d")
-                            }
-                            option_obj["rewards"].append(skill_entry)
-                    else:
-                        # Regular reward processing
-                        reward_entry = {"type": reward_type, "value": reward.get("v")}
-                        if "d" in reward:
-                            reward_entry["detail"] = reward["d"]
-                        option_obj["rewards"].append(reward_entry)
-                event_obj["choices"].append(option_obj)
             # Optionally handle history if present
             if "history" in entry:
                 event_obj["history"] = []
                 for hist in entry["history"]:
                     hist_data = hist.get("data", {})
-                    hist_event = {
+                    event_obj["history"].append({
                         "period": hist.get("period"),
                         "name": hist_data.get("n"),
-                        "choices": []
-                    }
-                    for option in hist_data.get("c", []):
-                        option_obj = {"option": option.get("o"), "rewards": []}
-                        for reward in option.get("r", []):
-                            reward_type = key_skill_map.get(reward.get("t"), reward.get("t"))
-                            
-                            # Special handling for "sr" (Skill Choice) type
-                            if reward.get("t") == "sr" and "d" in reward and isinstance(reward["d"], list):
-                                # Process each skill choice in the detail array
-                                for skill_choice in reward["d"]:
-                                    skill_entry = {
-                                        "type": "Skill Choice",
-                                        "value": skill_choice.get("v"),
-                                        "detail": skill_choice.get("d")
-                                    }
-                                    option_obj["rewards"].append(skill_entry)
-                            else:
-                                # Regular reward processing
-                                reward_entry = {"type": reward_type, "value": reward.get("v")}
-                                if "d" in reward:
-                                    reward_entry["detail"] = reward["d"]
-                                option_obj["rewards"].append(reward_entry)
-                        hist_event["choices"].append(option_obj)
-                    event_obj["history"].append(hist_event)
-            parsed_events.append(event_obj)
-        return parsed_events
+                        "choices": _decode_choices(hist_data)
+                    })
+            yield event_obj
     
     def extract_event_hints(self, all_events: dict) -> list:
         """
         Extract Skill Choice rewards from events and format them like hints_table entries
         """
+        card = {"all_events": all_events}
+        self.resolve_event_hints([card])
+        return card["hints_event_table"]
+
+    def resolve_event_hints(self, cards: List[dict]) -> None:
+        """
+        Fill hints_event_table for every card in the batch in two phases: collect each card's
+        Skill Hint ids, then resolve the union of them with one bulk lookup and attach the
+        results per card in first-seen order.
+        """
         from database import Database  # Import here to avoid circular imports
-        
-        event_hints = []
+
+        skill_ids_per_card = [self.collect_event_hint_skill_ids(card['all_events']) for card in cards]
+        all_skill_ids = set().union(*skill_ids_per_card)
+        skills = Database().get_skills_by_ids(sorted(all_skill_ids)) if all_skill_ids else {}
+
+        for card, skill_ids in zip(cards, skill_ids_per_card):
+            card['hints_event_table'] = [
+                {
+                    "type": "skill_hint",
+                    "skill_id": skill_id,
+                    "skill_data": dict(skills[skill_id]),
+                    "hint_level": 1  # Event hints are typically level 1
+                }
+                for skill_id in skill_ids
+                if skills[skill_id]
+            ]
+
+    def collect_event_hint_skill_ids(self, all_events: dict) -> Dict[int, None]:
+        """Skill ids of all Skill Hint rewards, deduplicated in first-seen order (dict keys as an ordered set)."""
+        skill_ids = {}
         
         # Process all event types
         for event_type in ['dates', 'chain_events', 'random_events', 'special_events']:
-            events = all_events.get(event_type, [])
-            
-            for event in events:
-                # Process regular choices
-                for choice in event.get('choices', []):
-                    for reward in choice.get('rewards', []):
-                        if reward.get('type') == 'Skill Hint' and 'detail' in reward:
-                            skill_id = reward['detail']
-                            skill_data = Database().get_skill_by_id(skill_id)
-                            
-                            if skill_data:
-                                hint_entry = {
-                                    "type": "skill_hint",
-                                    "skill_id": skill_id,
-                                    "skill_data": skill_data,
-                                    "hint_level": 1  # Event hints are typically level 1
-                                }
-                                # Avoid duplicates
-                                if not any(h.get('skill_id') == skill_id for h in event_hints):
-                                    event_hints.append(hint_entry)
-                
-                # Process history if present
-                for hist_event in event.get('history', []):
-                    for choice in hist_event.get('choices', []):
+            for event in all_events.get(event_type, []):
+                # Regular choices first, then those of the history variants
+                for variant in [event] + event.get('history', []):
+                    for choice in variant.get('choices', []):
                         for reward in choice.get('rewards', []):
                             if reward.get('type') == 'Skill Hint' and 'detail' in reward:
-                                skill_id = reward['detail']
-                                skill_data = Database().get_skill_by_id(skill_id)
-                                
-                                if skill_data:
-                                    hint_entry = {
-                                        "type": "skill_hint",
-                                        "skill_id": skill_id,
-                                        "skill_data": skill_data,
-                                        "hint_level": 1
-                                    }
-                                    # Avoid duplicates
-                                    if not any(h.get('skill_id') == skill_id for h in event_hints):
-                                        event_hints.append(hint_entry)
-        
-        return event_hints
\ No newline at end of file
+                                skill_ids[reward['detail']] = None
+        return skill_ids
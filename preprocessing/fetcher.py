@@ -0,0 +1,224 @@
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from helper import write_atomic
+
+
+class FetchError(Exception):
+    """Raised when a URL still fails after every retry."""
+
+    def __init__(self, url: str, reason: str) -> None:
+        super().__init__(f"Failed to fetch {url}: {reason}")
+        self.url = url
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: bursts up to `capacity` and a sustained rate of at most `maximum`
+    requests per second. Like AdaptiveLimit the rate is halved whenever the server throttles us and
+    grown back by a tenth of `maximum` after every `recovery` consecutive successes (AIMD).
+    A rate of 0 disables throttling.
+    """
+
+    def __init__(self, rate: float, capacity: float, recovery: int = 10) -> None:
+        self.maximum = rate
+        self.rate = rate
+        self.capacity = capacity
+        self._recovery = recovery
+        self._successes = 0
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.maximum <= 0:
+            return
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = max(self.maximum / 16, self.rate / 2)
+            self._successes = 0
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self._recovery and self.rate < self.maximum:
+                self._refill()
+                self.rate = min(self.maximum, self.rate + self.maximum / 10)
+                self._successes = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit that adapts to the server: halved whenever it answers 429/5xx,
+    then grown back by one after every `recovery` consecutive successes (AIMD).
+    """
+
+    def __init__(self, maximum: int, recovery: int = 10) -> None:
+        self.maximum = maximum
+        self.limit = maximum
+        self._recovery = recovery
+        self._successes = 0
+        self._active = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self) -> 'AdaptiveLimit':
+        with self._condition:
+            self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def throttled(self) -> None:
+        with self._condition:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+
+    def succeeded(self) -> None:
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self._recovery and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+
+
+class Fetcher:
+    """
+    Shared layer for every outbound request: one pooled session, per-host adaptive rate
+    (token bucket) and concurrency limits, and retries with exponential backoff and full jitter on
+    connection errors, 429 and 5xx (honouring Retry-After). URLs that still fail are recorded in
+    `failures` so a later run can pick them up again.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, requests_per_second: float = 20.0, burst: int = 10, max_concurrency: int = 8,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_cap: float = 30.0, timeout: float = 10) -> None:
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.failures: List[Dict] = []
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._limits: Dict[str, AdaptiveLimit] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **context) -> requests.Response:
+        """
+        GET url, retrying transient failures. Any other response (including 304 and 404) is returned
+        as is for the caller to handle. Raises FetchError once the retries are used up; the failure
+        is recorded together with `context` (e.g. the card id it belongs to).
+        """
+        host = urlsplit(url).netloc
+        bucket, limit = self._host_state(host)
+        reason = ""
+        retry_after = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self._backoff(attempt, retry_after))
+                retry_after = None
+            bucket.acquire()
+            with limit:
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    reason = f"{type(e).__name__}: {e}"
+                    continue
+            if response.status_code in self.RETRY_STATUSES:
+                limit.throttled()
+                bucket.throttled()
+                retry_after = self._retry_after(response)
+                reason = f"HTTP {response.status_code}"
+                continue
+            limit.succeeded()
+            bucket.succeeded()
+            return response
+
+        self.record_failure(url, reason, **context)
+        raise FetchError(url, reason)
+
+    def record_failure(self, url: str, reason: str, **context) -> None:
+        """Add a failure the caller detected itself (e.g. a 404 or an unparsable page) to the log."""
+        with self._lock:
+            self.failures.append({"url": url, "reason": reason, **context})
+
+    def write_failures(self, path: str) -> None:
+        """Write the failures of this run as JSON (an empty list clears the previous run's)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with write_atomic(path) as f:
+            json.dump(self.failures, f, ensure_ascii=False, indent=2)
+
+    def mount(self, adapter: BaseAdapter) -> None:
+        """Route every request through adapter (e.g. a FixtureAdapter) instead of the network."""
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _host_state(self, host: str) -> tuple:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+                self._limits[host] = AdaptiveLimit(self.max_concurrency)
+            return self._buckets[host], self._limits[host]
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_cap)
+        # Full jitter: anywhere between 0 and the exponential ceiling
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from helper import write_atomic
+
+
+class FixtureAdapter(BaseAdapter):
+    """
+    requests transport adapter that records GET responses into a fixture archive, or replays
+    them from one without touching the network. Mount it on a session (see Fetcher.mount) to run
+    the scraper and downloaders against a fixed snapshot of the site.
+
+    The archive is a single zip: index.json maps each URL to its status, headers and the sha256
+    of its body, and every distinct body is stored once (deflated) under bodies/<sha256>.
+    Conditional requests are answered from the recorded ETag / Last-Modified, so the page cache
+    behaves as it does against the live site.
+    """
+
+    MODES = ("record", "replay")
+    KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+    def __init__(self, path: str, mode: str, simulate_latency: bool = False) -> None:
+        """
+        Args:
+            path (str): Fixture archive (.zip). Recording adds to an existing archive.
+            mode (str): "record" (fetch live and capture) or "replay" (serve only from the archive).
+            simulate_latency (bool): In replay, sleep for the time each response originally took.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown fixture mode {mode!r}, expected one of {self.MODES}")
+        super().__init__()
+        self.path = path
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self._index: Dict[str, Dict] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._live = HTTPAdapter() if mode == "record" else None
+        self._archive: Optional[zipfile.ZipFile] = None
+
+        if os.path.exists(path):
+            self._archive = zipfile.ZipFile(path)
+            self._index = json.loads(self._archive.read("index.json"))
+        elif mode == "replay":
+            raise FileNotFoundError(f"Fixture archive not found: {path}")
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None) -> requests.Response:
+        if request.method != "GET":
+            raise ValueError(f"Fixtures only cover GET requests, got {request.method} {request.url}")
+        if self.mode == "record":
+            entry = self._record(request, timeout, verify, cert, proxies)
+        else:
+            entry = self._index.get(request.url)
+            if entry is None:
+                return self._build_response(request, 404, {}, b"", reason="Not in fixture archive")
+            if self.simulate_latency:
+                time.sleep(entry.get("elapsed", 0))
+        return self._respond(request, entry)
+
+    def close(self) -> None:
+        """Write the archive if anything was recorded."""
+        with self._lock:
+            if self._live is not None:
+                self._live.close()
+            if self._dirty:
+                self._write()
+                self._dirty = False
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+
+    def _record(self, request, timeout, verify, cert, proxies) -> Dict:
+        # Always capture the full body; conditional requests are answered from it afterwards
+        live_request = request.copy()
+        for header in ("If-None-Match", "If-Modified-Since"):
+            live_request.headers.pop(header, None)
+        start = time.perf_counter()
+        response = self._live.send(live_request, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        body = response.content
+        entry = {
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in self.KEPT_HEADERS if name in response.headers},
+            "body": hashlib.sha256(body).hexdigest(),
+            "elapsed": round(time.perf_counter() - start, 4),
+        }
+        with self._lock:
+            self._index[request.url] = entry
+            self._bodies[entry["body"]] = body
+            self._dirty = True
+        return entry
+
+    def _respond(self, request, entry: Dict) -> requests.Response:
+        headers = entry["headers"]
+        etag = request.headers.get("If-None-Match")
+        last_modified = request.headers.get("If-Modified-Since")
+        if entry["status"] == 200 and ((etag and etag == headers.get("ETag")) or (last_modified and last_modified == headers.get("Last-Modified"))):
+            return self._build_response(request, 304, headers, b"")
+        return self._build_response(request, entry["status"], headers, self._body(entry["body"]))
+
+    def _body(self, digest: str) -> bytes:
+        with self._lock:
+            body = self._bodies.get(digest)
+            if body is None:
+                body = self._archive.read(f"bodies/{digest}")
+                self._bodies[digest] = body
+            return body
+
+    def _write(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        digests = {entry["body"] for entry in self._index.values()}
+        with write_atomic(self.path, 'wb') as f:
+            with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("index.json", json.dumps(self._index, ensure_ascii=False, indent=1, sort_keys=True))
+                for digest in sorted(digests):
+                    body = self._bodies.get(digest)
+                    if body is None:
+                        body = self._archive.read(f"bodies/{digest}")
+                    archive.writestr(f"bodies/{digest}", body)
+            # The old archive must be closed before it is replaced (Windows)
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+
+    @staticmethod
+    def _build_response(request, status: int, headers: Dict[str, str], body: bytes, reason: str = "") -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason or requests.status_codes._codes.get(status, ("",))[0].upper().replace("_", " ")
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
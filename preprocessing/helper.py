@@ -1,7 +1,12 @@
 
 import json
+import os
+from contextlib import contextmanager
 
-from typing import Any
+from typing import TYPE_CHECKING, IO, Any, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def parse_signed_int(s: str) -> int:
@@ -23,6 +28,23 @@ def read_json_file(path: str) -> Any:
             return json.load(f)
     except FileNotFoundError:
         return []
+
+@contextmanager
+def write_atomic(path: str, mode: str = 'w') -> Iterator[IO]:
+    """
+    Open a temporary file next to path for writing and move it over path once the block is done,
+    so an interrupted run never leaves a truncated file behind. On error the temporary file is
+    removed and path stays as it was.
+    """
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, mode, **({} if 'b' in mode else {"encoding": "utf-8"})) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
     
 from typing import List, Tuple, Dict
@@ -64,3 +86,34 @@ def lerp_levels(values: Tuple[int, ...] | List[int]) -> Dict[str, int]:
                 result[idx] = -1
     return result
 
+
+def lerp_levels_batch(values: 'np.ndarray | List[List[int]]') -> 'np.ndarray':
+    """
+    Vectorized lerp_levels over a 2D array (rows x level columns), e.g. the whole
+    support_card_effect_table at once. Same semantics: -1 before a row's first known
+    value stays -1, gaps are filled with integer-floor interpolation and values after
+    the last known one repeat it.
+    """
+    import numpy as np
+    values = np.asarray(values, dtype=np.int64)
+    if values.ndim != 2 or values.size == 0:
+        return values.copy()
+    n_cols = values.shape[1]
+    known = values != -1
+    cols = np.arange(n_cols)
+
+    # Index of the nearest known value at or before / at or after each column (-1 / n_cols if none)
+    prev_idx = np.maximum.accumulate(np.where(known, cols, -1), axis=1)
+    next_idx = np.minimum.accumulate(np.where(known, cols, n_cols)[:, ::-1], axis=1)[:, ::-1]
+
+    has_prev = prev_idx >= 0
+    has_next = next_idx < n_cols
+    v0 = np.take_along_axis(values, np.clip(prev_idx, 0, n_cols - 1), axis=1)
+    v1 = np.take_along_axis(values, np.clip(next_idx, 0, n_cols - 1), axis=1)
+    span = np.where(has_prev & has_next & (next_idx > prev_idx), next_idx - prev_idx, 1)
+    interp = v0 + (v1 - v0) * (cols - prev_idx) // span
+
+    result = np.where(has_next, interp, v0)
+    result = np.where(known, values, result)
+    return np.where(has_prev, result, -1)
+
@@ -1,10 +1,18 @@
 
 import argparse
+import itertools
 import shutil
 import os
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Tuple
 
-from data_collecter import DataCollector
+# The pipeline modules are imported once the arguments are parsed, so --help and --copy-db
+# start without loading them (see `benchmark.py import-time`)
+if TYPE_CHECKING:
+    from data_collecter import DataCollector
+    from stages import StageScheduler
 
 
 def copy_db_from_steam() -> bool:
@@ -38,6 +46,129 @@ def copy_db_from_steam() -> bool:
         return False
 
 
+def optimize_images(args) -> None:
+    """Optional stage: smaller image variants, thumbnails and skill icon sprite atlases."""
+    from asset_optimizer import AssetOptimizer
+    optimizer = AssetOptimizer(formats=[f.strip() for f in args.image_formats.split(',') if f.strip()], thumbnail_width=args.thumbnail_width or None)
+    if not optimizer.available:
+        print("Pillow is not installed (pip install pillow) - skipping image optimization")
+        return
+
+    print("Optimizing card images...")
+    print(f"Card images: {optimizer.optimize_directory(args.output_images)}")
+    print("Optimizing skill icons...")
+    print(f"Skill icons: {optimizer.optimize_directory(args.output_skill_icons, thumbnails=False)}")
+    atlas = optimizer.build_atlas(args.output_skill_icons, args.skill_atlas_map)
+    print(f"Packed {len(atlas['icons'])} skill icons into {len(atlas['sheets'])} atlas sheets, map written to {args.skill_atlas_map}")
+
+
+PIPELINE_STAGES = ("extract", "scrape", "write", "card-images", "skill-icons", "optimize")
+
+
+def build_pipeline(args, data_collector: 'DataCollector', stages: List[str]) -> Tuple['StageScheduler', Callable[[], None]]:
+    """
+    The pipeline as stages for the scheduler, plus a callback to run once the scheduler is done:
+
+        extract ==> scrape ==> write
+           ||         :
+           ||         :.....> skill-icons --+
+           ++===============> card-images --+--> optimize
+
+    Cards stream between stages (==>) as soon as each one is ready: the scraper starts on the
+    first extracted cards, card images download while events are scraped, and data.json is
+    written (in order) as the scraper finishes cards. Skill icon ids stream in (...>) from both
+    extraction and scraping; both image stages feed the same download queue. With one stage job the stages simply run one after another.
+    Stages run without extract work on the existing data.json.
+    """
+    from asset_manifest import AssetManifest
+    from stages import StageScheduler, Stream, in_order
+
+    scheduler = StageScheduler(jobs=args.stage_jobs)
+    state = {"cards": None, "downloads": None}
+    cards_lock = threading.Lock()
+    # A Stream hands each item to one consumer, so every consumer of the cards gets its own
+    to_scrape, to_download, to_write, icon_ids = Stream(), Stream(), Stream(), Stream()
+    asset_paths: List[str] = []
+    manifest = AssetManifest(args.asset_manifest) if args.asset_manifest else None
+
+    def cards():
+        with cards_lock:
+            if state["cards"] is None:
+                state["cards"] = data_collector.extract(db_path=None, output_path=args.output_data)
+                if state["cards"] is None:
+                    raise RuntimeError("No data available")
+            return state["cards"]
+
+    def downloads():
+        # Both image stages feed one download queue (one executor, progress bar and summary)
+        with cards_lock:
+            if state["downloads"] is None:
+                state["downloads"] = data_collector.download_queue(workers=args.download_workers, manifest=manifest, refresh=args.refresh_assets)
+            return state["downloads"]
+
+    def extracted_card(card) -> None:
+        to_scrape.put(card)
+        to_download.put(card)
+        icon_ids.put_many(data_collector.skill_icon_ids([card]))
+
+    def scraped_card(card) -> None:
+        to_write.put(card)
+        icon_ids.put_many(data_collector.skill_icon_ids([card]))
+
+    def extract():
+        data = data_collector.extract(db_path=args.db, output_path=args.output_data, skip_existing=getattr(args, 'del'), persist_text_index=args.cache_text, db_open_mode=args.db_mode, jobs=args.jobs, on_card=extracted_card)
+        if data is None:
+            raise RuntimeError("No data available")
+        print(f"Data contains {len(data)} support cards.")
+        state["cards"] = data
+
+    def scrape():
+        if "extract" not in stages:
+            # Event hints are still resolved against master.mdb
+            data_collector.open_database(args.db, persist_text_index=args.cache_text, db_open_mode=args.db_mode)
+        # Cards are scraped in place, so the extracted list (in output order) stays the one to write
+        data_collector.scrape_events(to_scrape if "extract" in stages else cards(), page_cache_dir=args.page_cache or None, offline=args.offline, on_card=scraped_card)
+
+    def write():
+        # Reusing data.json without a database leaves nothing new to write, unless asked for explicitly
+        if "extract" in stages and not data_collector.extracted:
+            return
+        data = cards()
+        if "scrape" in stages:
+            data = in_order(data, to_write)
+        data_collector.write_outputs(data, args.output_data, compact=args.compact, compress=[c.strip() for c in args.compress.split(',') if c.strip()], shard_dir=args.shard_dir or None, normalize=args.normalize_skills, effects_dir=args.effects_export or None, catalog_path=args.catalog or None)
+
+    def card_images():
+        source = to_download if "extract" in stages else cards()
+        asset_paths.extend(data_collector.download_card_images(source, args.output_images, downloads()))
+
+    def skill_icons():
+        ids = icon_ids
+        if "extract" not in stages:
+            ids = itertools.chain(data_collector.skill_icon_ids(cards()), icon_ids)
+        asset_paths.extend(data_collector.download_skill_icons(ids, args.output_skill_icons, downloads()))
+
+    def finish() -> None:
+        if state["downloads"] is not None:
+            state["downloads"].close()
+        if manifest is None:
+            return
+        # Pruning needs every image this run wanted, so only when both image stages completed
+        complete = {"card-images", "skill-icons"} <= scheduler.completed
+        if args.prune_assets and not complete:
+            print("Not pruning images: card-images and skill-icons did not both complete")
+        data_collector.finish_asset_manifest(manifest, asset_paths, prune=args.prune_assets and complete)
+
+    scheduler.add("extract", extract, feeds=[to_scrape, to_download, icon_ids])
+    scheduler.add("scrape", scrape, consumes=["extract"], feeds=[to_write, icon_ids])
+    # Needs the whole extracted list for the output order
+    scheduler.add("write", write, after=["extract"], consumes=["scrape"])
+    scheduler.add("card-images", card_images, consumes=["extract"])
+    scheduler.add("skill-icons", skill_icons, consumes=["extract", "scrape"])
+    scheduler.add("optimize", lambda: optimize_images(args), after=["card-images", "skill-icons"])
+    return scheduler, finish
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description='Extract and process data from master.mdb')
     parser.add_argument('--db', default='./db/master.mdb', help='Path to the Access database file')
@@ -46,6 +177,33 @@ def main() -> None:
     parser.add_argument('--output_skill_icons', default='../front/public/images/skills/', help='Path to output skill icons directory')
     parser.add_argument('--del', action='store_true', default=False, help='Skip loading existing data.json and start fresh')
     parser.add_argument('--copy-db', action='store_true', default=False, help='Copy master.mdb from Steam installation to preprocessing/db/')
+    parser.add_argument('--cache-text', action='store_true', default=False, help='Persist the text_data index next to master.mdb and reuse it on later runs')
+    parser.add_argument('--page-cache', default='./cache/pages', help='Directory caching scraped event data (revalidated with conditional requests); empty to disable')
+    parser.add_argument('--offline', action='store_true', default=False, help='Scrape events only from the page cache, without network access')
+    parser.add_argument('--failures', default='./cache/failed_fetches.json', help='Where to write the requests that still failed after retrying')
+    parser.add_argument('--record', metavar='ARCHIVE', help='Fetch from the live site and record every response into a fixture archive (.zip)')
+    parser.add_argument('--replay', metavar='ARCHIVE', help='Serve every request from a fixture archive recorded with --record, without network access')
+    parser.add_argument('--replay-latency', action='store_true', default=False, help='With --replay, wait as long as each response originally took')
+    parser.add_argument('--rate', type=float, default=20.0, help='Most requests per second sent to each host; lowered automatically while the host answers 429/5xx and grown back afterwards (0: unlimited)')
+    parser.add_argument('--burst', type=int, default=10, help='Requests that may be sent to a host at once before --rate applies')
+    parser.add_argument('--download-workers', type=int, default=None, help='Number of concurrent image downloads (default: the fetcher\'s per-host concurrency)')
+    parser.add_argument('--asset-manifest', default='./cache/assets.json', help='Manifest of downloaded images (URL, size, sha256, validators) used to repair and refresh them; empty to only check that files exist')
+    parser.add_argument('--refresh-assets', action='store_true', default=False, help='Revalidate every downloaded image with a conditional request and replace the ones that changed')
+    parser.add_argument('--prune-assets', action='store_true', default=False, help='Delete downloaded images that no support card references any more')
+    parser.add_argument('--optimize-images', action='store_true', default=False, help='Write WebP/AVIF variants and thumbnails of the images and pack the skill icons into sprite atlases (requires Pillow)')
+    parser.add_argument('--image-formats', default='webp', help='Comma-separated formats for --optimize-images: webp, avif')
+    parser.add_argument('--thumbnail-width', type=int, default=128, help='Width of the card image thumbnails written by --optimize-images; 0 to skip them')
+    parser.add_argument('--skill-atlas-map', default='../front/src/app/data/skill_atlas.json', help='Where --optimize-images writes the skill icon atlas coordinates')
+    parser.add_argument('--compact', action='store_true', default=False, help='Write data.json without indentation (smaller production build)')
+    parser.add_argument('--compress', default='', help='Comma-separated precompressed copies of data.json to write next to it: gz, br (br requires brotli)')
+    parser.add_argument('--normalize-skills', action='store_true', default=False, help='Write data.json as {"skills": {id: skill}, "cards": [...]} with hints referencing skills by id instead of embedding them')
+    parser.add_argument('--catalog', default='', help='Also write an indexed SQLite catalog of the processed cards (effects, hints, skills, events) to this path')
+    parser.add_argument('--effects-export', default='', help='Also write the card effects as memory-mappable .npy arrays (card x effect type x limit break) to this directory')
+    parser.add_argument('--shard-dir', default='', help='Also write a slim index.json of card summaries plus content-addressed per-card detail shards (events, hints) to this directory')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes used to extract support cards')
+    parser.add_argument('--stage-jobs', type=int, default=1, help='Number of pipeline stages run concurrently; overlapping stages stream cards to each other as they are ready')
+    parser.add_argument('--stages', default='', help=f"Comma-separated stages to run (default: all but optimize, which --optimize-images adds): {', '.join(PIPELINE_STAGES)}")
+    parser.add_argument('--db-mode', choices=['default', 'immutable', 'memory'], default='default', help='How to open master.mdb: plain read-only, immutable + memory-mapped, or copied into memory')
     args = parser.parse_args()
 
     # Handle database copy if requested
@@ -56,28 +214,52 @@ def main() -> None:
         # If only copying DB, exit after successful copy
         if len([arg for arg in vars(args).values() if arg is True]) == 1:
             print("Database copy completed")
+            return
+
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+
+    from data_collecter import DataCollector
+    from stages import StageFailed
 
     data_collector = DataCollector()
-    data = data_collector.get_data(db_path=args.db, output_path=args.output_data, skip_existing=getattr(args, 'del'))
+    # Nothing to protect when replaying, so don't throttle and time only our own work
+    data_collector.fetcher_options = {"requests_per_second": 0 if args.replay else args.rate, "burst": args.burst}
+    if args.record or args.replay:
+        from fixtures import FixtureAdapter
+        if args.record:
+            data_collector.fetcher.mount(FixtureAdapter(args.record, "record"))
+        else:
+            data_collector.fetcher.mount(FixtureAdapter(args.replay, "replay", simulate_latency=args.replay_latency))
+    if args.stages:
+        stages = [name.strip() for name in args.stages.split(',') if name.strip()]
+        unknown = [name for name in stages if name not in PIPELINE_STAGES]
+        if unknown:
+            parser.error(f"Unknown stages {unknown}, expected some of {', '.join(PIPELINE_STAGES)}")
+    else:
+        stages = [name for name in PIPELINE_STAGES if name != "optimize" or args.optimize_images]
 
-    if data is None:
-        print("No data available. Exiting.")
+    scheduler, finish = build_pipeline(args, data_collector, stages)
+    start = time.perf_counter()
+    try:
+        scheduler.run(stages)
+    except StageFailed as e:
+        print(f"Pipeline failed: {e}")
         raise SystemExit(1)
-    print(f"Data contains {len(data)} support cards.")
+    finally:
+        data_collector.close_database()
+        finish()
+        print(scheduler.report(time.perf_counter() - start))
 
-    image_success = data_collector.download_images(data=data, output_dir=args.output_images)
+        # Without a fetcher nothing was requested, so there is no failure report to write
+        if data_collector.has_fetcher:
+            # Failed cards and images are simply retried by the next run; this is the report of what to expect
+            data_collector.fetcher.write_failures(args.failures)
+            if data_collector.fetcher.failures:
+                print(f"{len(data_collector.fetcher.failures)} requests failed, see {args.failures}. Run again to retry them.")
+            # Also writes the fixture archive when recording
+            data_collector.fetcher.close()
 
-    if not image_success:
-        print("Image download failed. Exiting.")
-        raise SystemExit(1)
-    
-    print("Downloading skill icons...")
-    skill_icon_success = data_collector.download_skill_images(data=data, output_dir=args.output_skill_icons)
-    
-    if not skill_icon_success:
-        print("Skill icon download failed. Exiting.")
-        raise SystemExit(1)
-    
     print("All tasks completed successfully.")
 
 if __name__ == '__main__':
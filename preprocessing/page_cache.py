@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from helper import write_atomic
+
+
+class PageCache:
+    """
+    Persistent cache of scraped pages keyed by URL. Only the extracted event payload is kept,
+    together with the ETag / Last-Modified validators used to revalidate it.
+    One small JSON file per URL, so concurrent writers never touch the same file.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest()[:32] + ".json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Cached entry for url: {"url", "payload", "etag", "last_modified"}, or None."""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, url: str, payload: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        path = self._path(url)
+        with write_atomic(path) as f:
+            json.dump({"url": url, "payload": payload, "etag": etag, "last_modified": last_modified}, f, ensure_ascii=False)
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified for a cached entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Sequence
+
+from helper import write_atomic
+
+
+class ShardWriter:
+    """
+    Alternative output layout for lazy loading: a slim index.json of card summaries plus one
+    detail shard per card holding its bulky fields (events and skill hints with their text).
+
+    Shards are content-addressed (cards/<id>.<hash>.json) and listed in the index with their
+    sha256, so a shard URL never changes meaning and can be cached forever; only index.json
+    has to be revalidated. Unchanged shards are not rewritten. Shards referenced by neither the
+    new nor the previous index are removed, so clients still holding the previous index keep working.
+    """
+
+    DETAIL_FIELDS = ("all_events", "hints_table", "hints_event_table")
+    SHARD_DIR = "cards"
+    INDEX_VERSION = 1
+
+    def __init__(self, directory: str, detail_fields: Sequence[str] = DETAIL_FIELDS) -> None:
+        self.directory = directory
+        self.detail_fields = tuple(detail_fields)
+
+    def write(self, cards: List[Dict[str, Any]]) -> Dict[str, int]:
+        shard_dir = os.path.join(self.directory, self.SHARD_DIR)
+        os.makedirs(shard_dir, exist_ok=True)
+        index_path = os.path.join(self.directory, "index.json")
+        previous_shards = self._shard_names(index_path)
+
+        index_cards = []
+        shard_names = set()
+        written = 0
+        for card in cards:
+            summary = {key: value for key, value in card.items() if key not in self.detail_fields}
+            detail = {"id": card["id"], **{key: card[key] for key in self.detail_fields if key in card}}
+            content = json.dumps(detail, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+            digest = hashlib.sha256(content).hexdigest()
+            name = f"{card['id']}.{digest[:16]}.json"
+            shard_names.add(name)
+
+            path = os.path.join(shard_dir, name)
+            if not os.path.exists(path):
+                with write_atomic(path, 'wb') as f:
+                    f.write(content)
+                written += 1
+            summary["shard"] = {"path": f"{self.SHARD_DIR}/{name}", "sha256": digest, "size": len(content)}
+            index_cards.append(summary)
+
+        index = {"version": self.INDEX_VERSION, "detail_fields": list(self.detail_fields), "cards": index_cards}
+        with write_atomic(index_path, 'wb') as f:
+            f.write(json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode('utf-8'))
+
+        # Only after the new index is in place, so a reader never sees an index pointing at a deleted shard
+        removed = 0
+        for name in os.listdir(shard_dir):
+            if name.endswith(".json") and name not in shard_names and name not in previous_shards:
+                os.remove(os.path.join(shard_dir, name))
+                removed += 1
+        return {"cards": len(index_cards), "written": written, "unchanged": len(index_cards) - written, "removed": removed}
+
+    @staticmethod
+    def _shard_names(index_path: str) -> set:
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return set()
+        return {os.path.basename(card["shard"]["path"]) for card in index.get("cards", []) if "shard" in card}
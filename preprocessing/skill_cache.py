@@ -0,0 +1,53 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class SkillCache:
+    """
+    Size-bounded LRU cache of skill dicts keyed by skill id, shared by every Database caller.
+    Misses (skills that don't exist) are cached too so they aren't queried again.
+    Callers always get their own copy of the cached dict.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[int, object]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, skill_id: int) -> Tuple[bool, Optional[Dict]]:
+        """Return (found, skill). found is False when the id has never been stored."""
+        with self._lock:
+            if skill_id not in self._entries:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._entries.move_to_end(skill_id)
+            skill = self._entries[skill_id]
+        return True, (None if skill is self._MISSING else dict(skill))
+
+    def store(self, skill_id: int, skill: Optional[Dict]) -> None:
+        self.store_many([(skill_id, skill)])
+
+    def store_many(self, skills: Iterable[Tuple[int, Optional[Dict]]]) -> None:
+        """Store a batch of (skill_id, skill) pairs under a single lock acquisition."""
+        with self._lock:
+            for skill_id, skill in skills:
+                self._entries[skill_id] = self._MISSING if skill is None else dict(skill)
+                self._entries.move_to_end(skill_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
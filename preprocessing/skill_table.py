@@ -0,0 +1,68 @@
+from typing import Any, Dict, List
+
+# Card fields whose entries embed a full skill_data dict
+HINT_FIELDS = ("hints_table", "hints_event_table")
+NORMALIZED_FORMAT = "skills-normalized"
+NORMALIZED_VERSION = 1
+
+
+def normalize_skills(cards: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Move every embedded skill_data into one top-level table keyed by skill id:
+        {"format": "skills-normalized", "version": 1, "skills": {"<id>": skill_data}, "cards": [...]}
+    Hint entries keep their skill_id and lose skill_data. Entries without a skill_data dict
+    (or whose skill_data disagrees with the table) are left untouched. The cards are not modified.
+    """
+    skills: Dict[str, Dict[str, Any]] = {}
+    normalized_cards = []
+    for card in cards:
+        card = dict(card)
+        for field in HINT_FIELDS:
+            if field not in card:
+                continue
+            entries = []
+            for entry in card[field]:
+                skill = entry.get("skill_data")
+                if isinstance(skill, dict) and "skill_id" in entry:
+                    key = str(entry["skill_id"])
+                    if skills.setdefault(key, skill) == skill:
+                        entry = {k: v for k, v in entry.items() if k != "skill_data"}
+                entries.append(entry)
+            card[field] = entries
+        normalized_cards.append(card)
+    return {"format": NORMALIZED_FORMAT, "version": NORMALIZED_VERSION, "skills": skills, "cards": normalized_cards}
+
+
+def expand_skills(document: Any) -> Any:
+    """
+    Rebuild the nested card list (every hint entry carrying its own skill_data copy) from a
+    normalized document. Anything that isn't a normalized document, such as an already nested
+    card list, is returned unchanged.
+    """
+    if not isinstance(document, dict) or document.get("format") != NORMALIZED_FORMAT:
+        return document
+    skills = document["skills"]
+    cards = []
+    for card in document["cards"]:
+        card = dict(card)
+        for field in HINT_FIELDS:
+            if field not in card:
+                continue
+            entries = []
+            for entry in card[field]:
+                if "skill_data" not in entry and str(entry.get("skill_id")) in skills:
+                    entry = _with_skill_data(entry, skills[str(entry["skill_id"])])
+                entries.append(entry)
+            card[field] = entries
+        cards.append(card)
+    return cards
+
+
+def _with_skill_data(entry: Dict[str, Any], skill: Dict[str, Any]) -> Dict[str, Any]:
+    # Put skill_data back right after skill_id, where the extraction places it
+    expanded = {}
+    for key, value in entry.items():
+        expanded[key] = value
+        if key == "skill_id":
+            expanded["skill_data"] = dict(skill)
+    return expanded
@@ -0,0 +1,194 @@
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+class Stream:
+    """
+    Iterable hand-off between stages: producers put() items while running, a consumer iterates
+    until every producer has finished. The scheduler closes a stream once all stages feeding it
+    are done (or skipped), so a failing producer can't leave its consumer waiting forever.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self) -> None:
+        self._queue: 'queue.Queue[Any]' = queue.Queue()
+
+    def put(self, item: Any) -> None:
+        self._queue.put(item)
+
+    def put_many(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self._queue.put(item)
+
+    def close(self) -> None:
+        self._queue.put(self._CLOSED)
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            item = self._queue.get()
+            if item is self._CLOSED:
+                # Leave the marker for any other consumer
+                self._queue.put(item)
+                return
+            yield item
+
+
+def in_order(items: Sequence[Any], finished: Iterable[Any]) -> Iterator[Any]:
+    """
+    Yield items in their own order, each as soon as finished (e.g. a Stream) has produced it;
+    finished may produce them in any order. Items are matched by identity. Once finished ends,
+    the remaining items are yielded as they are.
+    """
+    done = set()
+    finished = iter(finished)
+    end = object()
+    for item in items:
+        while id(item) not in done:
+            produced = next(finished, end)
+            if produced is end:
+                break
+            done.add(id(produced))
+        yield item
+
+
+class Stage:
+    def __init__(self, name: str, run: Callable[[], Any], after: Sequence[str] = (), consumes: Sequence[str] = (), feeds: Sequence[Stream] = ()) -> None:
+        self.name = name
+        self.run = run
+        self.after = tuple(after)
+        self.consumes = tuple(consumes)
+        self.feeds = tuple(feeds)
+
+
+class StageSkipped(Exception):
+    """Marks a stage that didn't run because a stage it depends on failed."""
+
+
+class StageFailed(Exception):
+    def __init__(self, failures: Dict[str, BaseException]) -> None:
+        super().__init__("Stages failed: " + ", ".join(f"{name} ({error})" for name, error in failures.items()))
+        self.failures = failures
+
+
+class StageScheduler:
+    """
+    Runs pipeline stages on a thread pool of `jobs` workers as soon as their dependencies allow:
+    - after: stages that must have finished first.
+    - consumes: stages this one streams items from (through a Stream they feed). It may start
+      while they are still running, but only once they have started, so a consumer never holds
+      the worker its producer is waiting for. With one worker that simply means after them.
+    Dependencies that aren't part of the run are ignored. A failed stage skips everything that
+    depends on it; the others still run. With jobs=1 stages run one at a time in the order they
+    were added.
+    """
+
+    def __init__(self, jobs: int = 1) -> None:
+        self.jobs = max(1, jobs)
+        self.stages: Dict[str, Stage] = {}
+        self.timings: Dict[str, float] = {}
+        self.completed = set()
+
+    def add(self, name: str, run: Callable[[], Any], after: Sequence[str] = (), consumes: Sequence[str] = (), feeds: Sequence[Stream] = ()) -> None:
+        for dependency in (*after, *consumes):
+            if dependency not in self.stages:
+                raise ValueError(f"Stage {name!r} depends on unknown stage {dependency!r} (add stages in dependency order)")
+        self.stages[name] = Stage(name, run, after, consumes, feeds)
+
+    def run(self, only: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Run the selected stages (all by default). Returns the wall time of each stage in seconds."""
+        selected = list(self.stages) if only is None else [name for name in self.stages if name in set(only)]
+        unknown = set(only or ()) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages {sorted(unknown)}, expected some of {list(self.stages)}")
+
+        pending = list(selected)
+        started = set()
+        done = set()
+        failures: Dict[str, BaseException] = {}
+        running = {}
+        lock = threading.Lock()
+
+        # A stream closes once every selected stage feeding it has finished; unselected feeders never will
+        feeders: Dict[int, List[str]] = {}
+        streams: Dict[int, Stream] = {}
+        for name in self.stages:
+            for stream in self.stages[name].feeds:
+                streams[id(stream)] = stream
+                feeders.setdefault(id(stream), [])
+                if name in selected:
+                    feeders[id(stream)].append(name)
+        for key, names in feeders.items():
+            if not names:
+                streams[key].close()
+
+        def finished(name: str) -> None:
+            for stream in self.stages[name].feeds:
+                feeders[id(stream)].remove(name)
+                if not feeders[id(stream)]:
+                    stream.close()
+
+        def timed(stage: Stage) -> Any:
+            start = time.perf_counter()
+            try:
+                return stage.run()
+            finally:
+                with lock:
+                    self.timings[stage.name] = time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while pending or running:
+                for name in list(pending):
+                    if len(running) >= self.jobs:
+                        break
+                    stage = self.stages[name]
+                    hard = [d for d in stage.after if d in selected]
+                    soft = [d for d in stage.consumes if d in selected]
+                    if any(d in failures for d in hard + soft):
+                        pending.remove(name)
+                        failures[name] = StageSkipped(name)
+                        print(f"[stages] skipping {name}: a stage it depends on failed")
+                        finished(name)
+                        continue
+                    if all(d in done for d in hard) and all(d in done or d in started for d in soft):
+                        # With one worker a consumer would block its own producer, so wait for it instead
+                        if self.jobs == 1 and not all(d in done for d in soft):
+                            continue
+                        pending.remove(name)
+                        started.add(name)
+                        print(f"[stages] starting {name}")
+                        running[executor.submit(timed, stage)] = name
+                if not running:
+                    if pending:
+                        raise RuntimeError(f"Stages {pending} can never start")
+                    break
+
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        done.add(name)
+                        self.completed.add(name)
+                        print(f"[stages] finished {name} in {self.timings[name]:.2f}s")
+                    else:
+                        failures[name] = error
+                        print(f"[stages] {name} failed after {self.timings[name]:.2f}s: {error}")
+                    finished(name)
+
+        real_failures = {name: error for name, error in failures.items() if not isinstance(error, StageSkipped)}
+        if real_failures:
+            raise StageFailed(real_failures)
+        return dict(self.timings)
+
+    def report(self, total: Optional[float] = None) -> str:
+        lines = [f"{'stage':<15} {'wall (s)':>10}"]
+        for name in self.stages:
+            if name in self.timings:
+                lines.append(f"{name:<15} {self.timings[name]:>10.2f}")
+        if total is not None:
+            lines.append(f"{'total':<15} {total:>10.2f}")
+        return "\n".join(lines)
@@ -163,7 +163,9 @@ class SupportCard:
                     for reward in group:
                         rtype = reward["type"]
                         if rtype in group_stats:
-                            group_stats[rtype] += parse_signed_int(reward["value"])
+                            # "amount" is decoded by the scraper; older data.json files only have the string
+                            amount = reward.get("amount")
+                            group_stats[rtype] += amount if amount is not None else parse_signed_int(reward["value"])
                     
                     # Add this group's contribution weighted by probability
                     for k in stat_keys:
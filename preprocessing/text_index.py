@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+from helper import write_atomic
+
+
+class TextIndex:
+    """
+    In-memory copy of the text_data categories the pipeline reads, keyed by (category, index).
+    Optionally persisted next to master.mdb so warm starts skip the table scan.
+    """
+
+    # 47: skill names, 48: skill descriptions, 78: support card names, 151: effect type names
+    CATEGORIES: Tuple[int, ...] = (47, 48, 78, 151)
+    CACHE_SUFFIX = ".text_index.json"
+    _CACHE_VERSION = 1
+
+    def __init__(self, entries: Dict[Tuple[int, int], str]) -> None:
+        self._entries = entries
+
+    def get(self, category: int, index: int) -> Optional[str]:
+        return self._entries.get((category, index))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection, categories: Iterable[int] = CATEGORIES) -> 'TextIndex':
+        """Load the requested categories in a single scan of text_data."""
+        categories = tuple(categories)
+        placeholders = ", ".join("?" for _ in categories)
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT category, "index", text FROM text_data WHERE category IN ({placeholders})', categories)
+        entries: Dict[Tuple[int, int], str] = {}
+        for category, index, text in cursor.fetchall():
+            # Keep the first row, same as a point query with fetchone()
+            entries.setdefault((category, index), text)
+        return cls(entries)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, db_path: str, categories: Iterable[int] = CATEGORIES, persist: bool = False) -> 'TextIndex':
+        """
+        Build the index from the database, or when persist is set, reuse the cache file next to
+        db_path if it was written for the same database file and categories (and write it otherwise).
+        """
+        categories = tuple(categories)
+        if not persist:
+            return cls.from_connection(conn, categories)
+
+        cache_path = db_path + cls.CACHE_SUFFIX
+        fingerprint = cls._fingerprint(db_path, categories)
+        cached = cls._read_cache(cache_path, fingerprint)
+        if cached is not None:
+            return cached
+
+        index = cls.from_connection(conn, categories)
+        index.save(cache_path, fingerprint)
+        return index
+
+    def save(self, cache_path: str, fingerprint: Dict) -> None:
+        payload = {
+            "fingerprint": fingerprint,
+            "entries": [[category, index, text] for (category, index), text in self._entries.items()],
+        }
+        with write_atomic(cache_path) as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def _read_cache(cls, cache_path: str, fingerprint: Dict) -> Optional['TextIndex']:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if payload.get("fingerprint") != fingerprint:
+            return None
+        return cls({(category, index): text for category, index, text in payload["entries"]})
+
+    @classmethod
+    def _fingerprint(cls, db_path: str, categories: Tuple[int, ...]) -> Dict:
+        stat = os.stat(db_path)
+        return {
+            "version": cls._CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "categories": list(categories),
+        }